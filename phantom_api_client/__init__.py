@@ -18,5 +18,37 @@ copies or substantial portions of the Software.
 You should have received a copy of the SSPL along with this program.
 If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
 
-from phantom_api_client.client import PhantomApiClient
-from phantom_api_client.models import *
+import importlib
+from typing import Any, List
+
+from phantom_api_client import models
+
+# Exported name -> submodule; imported on first access (e.g. aiohttp/delorean only load with the client)
+EXPORTS = {'ClientPool':           'pool',
+           'CompactRecord':        'results',
+           'CompactStore':         'results',
+           'LazyRecord':           'lazy',
+           'PhantomApiClient':     'client',
+           'RecordLoader':         'loader',
+           'SpillList':            'results',
+           'SyncPhantomApiClient': 'sync',
+           'UserDirectory':        'directory'}
+
+__all__ = [*EXPORTS.keys(), *models.__all__]
+
+
+def __getattr__(name: str) -> Any:
+    if name in EXPORTS:
+        value = getattr(importlib.import_module(f'{__name__}.{EXPORTS[name]}'), name)
+    elif name in models.MODELS:
+        value = getattr(models, name)
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals().keys(), *__all__})
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Command Line
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from os import getenv
+from typing import Dict, List, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+# Heavy dependencies (aiohttp, delorean, the client and models) are imported inside the commands
+QUERIES = {'container': 'ContainerQuery', 'artifact': 'ArtifactQuery', 'user': 'UserQuery'}
+
+
+class Progress:
+    """Live record rate/ETA on stderr."""
+
+    def __init__(self, total: Optional[int] = None, label: Optional[str] = 'records', stream: Optional[TextIO] = None,
+                 interval: Optional[float] = 0.5):
+        self.total = total
+        self.label = label
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.count = 0
+        self.started = time.perf_counter()
+        self.shown = 0.0
+
+    def update(self, n: int) -> None:
+        self.count += n
+        now = time.perf_counter()
+        if now - self.shown >= self.interval:
+            self.shown = now
+            self.show(now)
+
+    def show(self, now: float, end: Optional[str] = '') -> None:
+        elapsed = max(now - self.started, 1e-9)
+        rate = self.count / elapsed
+        line = f'\r{self.count}{f"/{self.total}" if self.total is not None else ""} {self.label} {rate:,.0f}/s'
+        if self.total and rate:
+            line += f' ETA {max(self.total - self.count, 0) / rate:,.0f}s'
+        self.stream.write(f'{line} {elapsed:,.1f}s elapsed{end}')
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.show(time.perf_counter(), end='\n')
+
+
+def parse_pairs(pairs: Optional[List[str]]) -> Dict[str, str]:
+    """['_filter_tenant=2'] -> {'_filter_tenant': '2'}; values are passed to Phantom as given."""
+    dct = {}
+    for pair in pairs or []:
+        k, sep, v = pair.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f'Expected key=value, got: {pair}')
+        dct[k] = v
+
+    return dct
+
+
+def parse_values(pairs: Optional[List[str]]) -> dict:
+    """['status="closed"', 'severity=high'] -> {'status': 'closed', 'severity': 'high'}; json values are decoded."""
+    dct = {}
+    for k, v in parse_pairs(pairs).items():
+        try:
+            dct[k] = json.loads(v)
+        except ValueError:
+            dct[k] = v
+
+    return dct
+
+
+def build_query(args: argparse.Namespace):
+    from phantom_api_client import models
+
+    return getattr(models, QUERIES[args.type])(filter=parse_pairs(args.filter) or None, page_size=args.page_size)
+
+
+async def count(client, args: argparse.Namespace) -> int:
+    results = await client.get_record_count(build_query(args))
+    if results.failure:
+        logger.error(results.failure)
+        return 1
+
+    print(results.success[0]['count'])
+
+    return 0
+
+
+async def export(client, args: argparse.Namespace) -> int:
+    query = build_query(args)
+    results = await client.get_record_count(query)
+    if results.failure:
+        logger.error(results.failure)
+        return 1
+
+    total = results.success[0]
+    progress = Progress(total['count']) if args.progress else None
+    output = open(args.output, 'w') if args.output != '-' else sys.stdout
+    failures = 0
+
+    try:
+        async for page in client.get_pages(query, page_limit=total['num_pages']):
+            output.writelines(json.dumps(r, separators=(',', ':')) + '\n' for r in page.success)
+            failures += len(page.failure)
+            if progress:
+                progress.update(len(page.success))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if progress:
+            progress.close()
+
+    return 1 if failures else 0
+
+
+async def apply(client, args: argparse.Namespace, action: str, values: Optional[dict] = None) -> int:
+    """Runs a delete/update Pipeline; records are acted on page by page as they are read."""
+    import asyncio
+
+    from phantom_api_client.pipeline import Pipeline
+
+    query = build_query(args)
+    results = await client.get_record_count(query)
+    if results.failure:
+        logger.error(results.failure)
+        return 1
+
+    total = results.success[0]['count']
+    if not args.yes:
+        change = f' with {values}' if values else ''
+        print(f'Would {action} {total} {args.type}(s){change}; re-run with --yes.', file=sys.stderr)
+        return 0
+
+    pipeline = Pipeline(client, query, action=action, values=values, write_concurrency=args.concurrency)
+    progress = Progress(total, label=f'{action}d') if args.progress else None
+
+    async def show() -> None:
+        while True:
+            await asyncio.sleep(progress.interval)
+            progress.update(len(pipeline.results.success) - progress.count)
+
+    ticker = asyncio.ensure_future(show()) if progress else None
+    try:
+        results = await pipeline.run()
+    finally:
+        if ticker:
+            ticker.cancel()
+            progress.update(len(pipeline.results.success) - progress.count)
+            progress.close()
+
+    if results.failure:
+        logger.error(f'{len(results.failure)} {args.type}(s) failed to {action}.')
+
+    return 1 if results.failure else 0
+
+
+async def delete(client, args: argparse.Namespace) -> int:
+    return await apply(client, args, 'delete')
+
+
+async def update(client, args: argparse.Namespace) -> int:
+    values = parse_values(args.set)
+    if not values:
+        raise SystemExit('update requires at least one --set key=value')
+
+    return await apply(client, args, 'update', values)
+
+
+def parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('type', choices=list(QUERIES.keys()))
+    common.add_argument('-c', '--cfg', default=f'{getenv("CFG_HOME", ".")}/phantom_api_client.toml',
+                        help='Configuration file (json/toml); default $CFG_HOME/phantom_api_client.toml')
+    common.add_argument('-f', '--filter', action='append', metavar='KEY=VALUE',
+                        help="Phantom filter; repeatable, e.g. -f _filter_tenant=2 -f '_filter_status=\"new\"'")
+    common.add_argument('--page-size', type=int, default=1000)
+    common.add_argument('-q', '--quiet', action='store_true', help='No progress output; default shown when stderr is a terminal')
+    common.add_argument('-v', '--verbose', action='store_true')
+
+    writes = argparse.ArgumentParser(add_help=False)
+    writes.add_argument('-y', '--yes', action='store_true', help='Apply; otherwise only report what would change')
+    writes.add_argument('--concurrency', type=int, default=100, help='Writes in flight at once')
+
+    p = argparse.ArgumentParser(prog='phantom-api-client', description='Phantom API Client bulk jobs')
+    sub = p.add_subparsers(dest='command', required=True)
+    sub.add_parser('count', parents=[common], help='Count matching records')
+    export_parser = sub.add_parser('export', parents=[common], help='Stream matching records as ndjson')
+    export_parser.add_argument('-o', '--output', default='-', help='File; default stdout')
+    sub.add_parser('delete', parents=[common, writes], help='Delete matching records')
+    update_parser = sub.add_parser('update', parents=[common, writes], help='Update matching records')
+    update_parser.add_argument('-s', '--set', action='append', metavar='KEY=VALUE',
+                               help='Field to set; repeatable, json values are decoded')
+
+    return p
+
+
+COMMANDS = {'count': count, 'export': export, 'delete': delete, 'update': update}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+    args.progress = not args.quiet and sys.stderr.isatty()
+
+    if args.command in ('delete', 'update') and args.type == 'user':
+        raise SystemExit(f'{args.command} supports container and artifact')
+
+    import asyncio
+
+    from phantom_api_client.client import PhantomApiClient
+
+    async def run() -> int:
+        async with PhantomApiClient(cfg=args.cfg) as client:
+            return await COMMANDS[args.command](client, args)
+
+    try:
+        return asyncio.run(run())
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == '__main__':
+    sys.exit(main())
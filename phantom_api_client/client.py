@@ -19,22 +19,74 @@ You should have received a copy of the SSPL along with this program.
 If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
 
 import asyncio
+import codecs
+import csv
+import datetime as dt
+import gzip
+import json
 import logging
-from typing import Any, List, NoReturn, Tuple, Union
+import time
+import zlib
+from collections import deque
+from contextlib import AsyncExitStack
+from copy import deepcopy
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, NoReturn, Optional, Tuple, Union
 from uuid import uuid4
 
-from delorean import parse
-
 from base_api_client import BaseApiClient, Results
 from phantom_api_client.models import *
+from phantom_api_client.models.audit import normalize_key, to_datetime
+from phantom_api_client.directory import UserDirectory
+from phantom_api_client.lazy import LazyPage
+from phantom_api_client.loader import RecordLoader
+from phantom_api_client.metrics import endpoint_label, MetricsRegistry
+from phantom_api_client.pipeline import Pipeline
+from phantom_api_client.pool import ThreadSafeSemaphore
+from phantom_api_client.results import CompactStore, SpillList
+from phantom_api_client.tracing import Tracer
+from phantom_api_client.write_buffer import WriteBuffer
 
 logger = logging.getLogger(__name__)
 
+ABANDONED = object()  # In-flight result when a coalesced GET's leader is cancelled before it completes
+
+
+def chunk(items: Iterable[Any], size: int) -> List[List[Any]]:
+    """Splits items into lists of at most size items.
+
+    Args:
+        items (Iterable[Any]):
+        size (int):
+
+    Returns:
+        chunks (List[List[Any]])"""
+    items = list(items)
+
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def record_key(record: dict) -> Union[tuple, str]:
+    """Hashable identity of a record; used to de-duplicate overlapping results.
+
+    Args:
+        record (dict):
+
+    Returns:
+        key (Union[tuple, str])"""
+    try:
+        key = tuple(record.items())
+        hash(key)
+    except TypeError:
+        key = json.dumps(record, sort_keys=True, default=str)
+
+    return key
+
 
 class PhantomApiClient(BaseApiClient):
     """Phantom API Client"""
 
-    def __init__(self, cfg: Union[str, dict]):
+    def __init__(self, cfg: Union[str, dict], buffer_size: Optional[int] = None, buffer_delay: Optional[float] = None,
+                 coalesce: Optional[bool] = True, compress_threshold: Optional[int] = None):
         """Initializes Class
 
         Args:
@@ -42,15 +94,196 @@ class PhantomApiClient(BaseApiClient):
                 pointing to a configuration file (json/toml). See
                 config.* in the examples folder for reference.
             sem (Optional[int]): An integer that defines the number of parallel
-                requests to make."""
+                requests to make.
+            buffer_size (Optional[int]): Enables the write-behind buffer; flush
+                once this many records have pending updates.
+            buffer_delay (Optional[float]): Enables the write-behind buffer; flush
+                this many seconds after the first pending update.
+            coalesce (Optional[bool]): Share one request among identical in-flight GETs; each caller gets its own copy.
+            compress_threshold (Optional[int]): Gzip json request bodies of at least this many
+                bytes; only enable if the server (or proxy in front of it) accepts
+                'Content-Encoding: gzip' request bodies. Responses are always negotiated
+                with 'Accept-Encoding: gzip' and decompressed as they stream in."""
         BaseApiClient.__init__(self, cfg=cfg)
+        self.write_buffer: Optional[WriteBuffer] = None
+        self.sdi_cache: Dict[str, dict] = {}  # source_data_identifier -> container record
+        self.tracer: Optional[Tracer] = None
+        self.metrics: Optional[MetricsRegistry] = None
+        self.loaders: Dict[type, RecordLoader] = {}
+        self.users: Optional[UserDirectory] = None
+        self.container_list_cache: Dict[str, Dict[int, Tuple[Optional[str], List[dict]]]] = {}  # kind -> id -> (update_time, list)
+        self.coalesce = coalesce
+        self.compress_threshold = compress_threshold
+        self.session.headers.setdefault('Accept-Encoding', 'gzip, deflate')
+        self.in_flight: Dict[Tuple[str, str], list] = {}  # (end_point, parameters) -> [response future, followers]
+        self.limit: Optional[ThreadSafeSemaphore] = None  # In-flight limit shared across loops; see ClientPool
+        if buffer_size or buffer_delay:
+            self.write_buffer = WriteBuffer(self, size=buffer_size or 100, delay=buffer_delay or 1.0)
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type: None, exc_val: None, exc_tb: None) -> NoReturn:
+        if self.write_buffer is not None:
+            await self.write_buffer.flush()
+
+        if self.metrics and self.metrics.server:
+            self.metrics.server.close()
+
+        if self.users is not None:
+            self.users.close()
+
         await BaseApiClient.__aexit__(self, exc_type, exc_val, exc_tb)
 
+    def enable_tracing(self, *callbacks) -> Tracer:
+        """Enables per-request tracing; each callback receives a Span once its request finishes.
+           - Spans carry semaphore wait, connect/TLS, time-to-first-byte, download and decode timings
+           - process_results calls are emitted as 'process' spans
+           - See tracing.OpenTelemetryExporter for an OpenTelemetry callback
+
+        Args:
+            *callbacks (Callable[[Span], None]):
+
+        Returns:
+            tracer (Tracer)"""
+        if not self.tracer:
+            self.tracer = Tracer()
+            self.session._trace_configs.append(self.tracer.trace_config())
+
+        self.tracer.callbacks.extend(callbacks)
+
+        return self.tracer
+
+    async def enable_metrics(self, registry: Optional[MetricsRegistry] = None, port: Optional[int] = None) -> MetricsRegistry:
+        """Enables the metrics registry; fed from the request path via tracing.
+           - requests by end_point/method/status, bytes in/out, records decoded, retries,
+             coalesced GETs, compression ratio, semaphore wait, in-flight and request/page latency
+
+        Args:
+            registry (Optional[MetricsRegistry]): Share one registry between clients
+            port (Optional[int]): Serve Prometheus text on http://127.0.0.1:{port}/metrics
+
+        Returns:
+            registry (MetricsRegistry)"""
+        if not self.metrics:
+            self.metrics = registry or MetricsRegistry()
+            self.enable_tracing(self.metrics.observe_span)
+
+        if port and not self.metrics.server:
+            await self.metrics.serve(port=port)
+
+        return self.metrics
+
+    async def request(self, method: str, end_point: str, request_id: str, **kwargs) -> Any:
+        """Wraps BaseApiClient.request; every client method sends through here.
+           - Identical in-flight GETs (end_point and parameters) share one request; each caller gets its own
+             (deep) copy of the decoded response, so mutating returned records never affects another caller
+           - If the sending caller is cancelled, a waiting caller takes over and sends the request itself
+           - json bodies of at least compress_threshold bytes are sent gzipped"""
+        if self.compress_threshold and kwargs.get('json') is not None:
+            kwargs = self.__compress(kwargs)
+
+        if not self.coalesce or method.lower() != 'get':
+            return await self.__send(method, end_point, request_id, **kwargs)
+
+        key = (end_point, json.dumps(kwargs, sort_keys=True, default=str))
+        coalesced = False
+        while True:
+            try:
+                shared = self.in_flight[key]
+            except KeyError:
+                return await self.__lead(key, method, end_point, request_id, **kwargs)
+
+            future = shared[0]
+            shared[1] += 1
+            if self.metrics and not coalesced:
+                self.metrics.coalesced.inc(end_point=endpoint_label(end_point))
+            coalesced = True
+
+            response = await asyncio.shield(future)
+            if response is ABANDONED:  # The leader was cancelled; the next follower to get here sends it
+                continue
+
+            response = deepcopy(response)
+            if type(response) is dict and 'request_id' in response:
+                response['request_id'] = request_id
+
+            return response
+
+    async def __lead(self, key: Tuple[str, str], method: str, end_point: str, request_id: str, **kwargs) -> Any:
+        """Sends a coalesced GET and shares its outcome with the followers waiting on in_flight[key]."""
+        shared = self.in_flight[key] = [asyncio.get_event_loop().create_future(), 0]
+        future = shared[0]
+        try:
+            response = await self.__send(method, end_point, request_id, **kwargs)
+            future.set_result(response)
+            if shared[1]:  # Followers copy the shared response; the leader must not mutate it before they do
+                response = deepcopy(response)
+        except asyncio.CancelledError:
+            future.set_result(ABANDONED)
+            raise
+        except Exception as excp:
+            future.set_exception(excp)
+            future.exception()  # Retrieved; no warning when nothing else was waiting
+            raise
+        finally:
+            del self.in_flight[key]
+
+        return response
+
+    def __compress(self, kwargs: dict) -> dict:
+        """Replaces a large json body with its gzipped encoding."""
+        body = json.dumps(kwargs['json']).encode()
+        if len(body) < self.compress_threshold:
+            return kwargs
+
+        data = gzip.compress(body, compresslevel=6)
+        if self.metrics:
+            self.metrics.observe_compression('out', len(body), len(data))
+
+        kwargs = {k: v for k, v in kwargs.items() if k != 'json'}
+        kwargs['headers'] = {**(kwargs.get('headers') or {}), 'Content-Encoding': 'gzip', 'Content-Type': 'application/json'}
+        kwargs['data'] = data
+
+        return kwargs
+
+    async def __send(self, method: str, end_point: str, request_id: str, **kwargs) -> Any:
+        """Sends one request under the shared in-flight limit (if any).
+           - The span starts and in_flight is incremented before the limit is acquired, as in __stream,
+             so time spent waiting on the limit is traced and counted"""
+        span = self.tracer.start(method, end_point, request_id, kwargs.get('params')) if self.tracer else None
+        if self.metrics:
+            self.metrics.in_flight.inc()
+
+        try:
+            async with self.limit or AsyncExitStack():
+                response = await BaseApiClient.request(self, method=method, end_point=end_point, request_id=request_id,
+                                                       **kwargs)
+        except Exception as excp:
+            if span:
+                self.tracer.finish(span, excp)
+            raise
+        finally:
+            if self.metrics:
+                self.metrics.in_flight.dec()
+
+        if span:
+            self.tracer.finish(span)
+
+        return response
+
+    async def process_results(self, results: Results, data_key: Optional[str] = None, end_point: Optional[str] = '',
+                              **kwargs) -> Results:
+        """Wraps BaseApiClient.process_results; traced as a 'process' span labelled with end_point."""
+        if not self.tracer:
+            return await BaseApiClient.process_results(self, results, data_key, **kwargs)
+
+        started = time.perf_counter()
+        results = await BaseApiClient.process_results(self, results, data_key, **kwargs)
+        self.tracer.process(end_point, started, len(results.success) + len(results.failure))
+
+        return results
+
     @staticmethod
     async def __date_filter(query: Union[ContainerQuery], results: Results) -> Results:
         """Date Filter
@@ -63,6 +296,8 @@ class PhantomApiClient(BaseApiClient):
         Returns:
             results (Results):
         """
+        from delorean import parse
+
         results.success = [r for r in results.success if query.date_filter_start <=
                            parse(r[query.date_filter_field], dayfirst=False) <= query.date_filter_end]
         return results
@@ -89,24 +324,222 @@ class PhantomApiClient(BaseApiClient):
                                                   params=query.dict()))]
 
         logger.debug('-> Complete.')
-        return await self.process_results(Results(data=await asyncio.gather(*tasks)))
+        return await self.process_results(Results(data=await asyncio.gather(*tasks)), end_point=query.end_point)
+
+    async def get_pages(self, query: Union[ArtifactQuery, ContainerQuery, UserQuery],
+                        page_limit: Optional[int] = None, window: Optional[int] = 20) -> AsyncIterator[Results]:
+        """Yields processed (and date filtered) pages in page order.
+           - At most window pages are requested ahead of the consumer
+
+        Args:
+            query (Union[ArtifactQuery, ContainerQuery, UserQuery]):
+            page_limit (Optional[int]): Number of pages; looked up if not given
+            window (Optional[int]): Pages in flight/buffered
+
+        Returns:
+            pages (AsyncIterator[Results])"""
+        if page_limit is None:
+            if not query.id:
+                page_limit = (await self.get_record_count(query)).success[0]['num_pages']
+            else:
+                page_limit = 1
+
+        async def get_page(i: int) -> Results:
+            response = await self.request(method='get',
+                                          end_point=query.end_point,
+                                          request_id=uuid4().hex,
+                                          params={**query.dict(), 'page': i})
+            page = await self.process_results(Results(data=[response]), query.data_key, query.end_point)
+            if query.date_filter_field:
+                page = await self.__date_filter(query=query, results=page)
+
+            return page
+
+        tasks = deque()
+        try:
+            for i in range(0, page_limit):
+                tasks.append(asyncio.create_task(get_page(i)))
+                if len(tasks) >= window:
+                    yield await tasks.popleft()
+
+            while tasks:
+                yield await tasks.popleft()
+        finally:
+            [t.cancel() for t in tasks]
+
+    @staticmethod
+    def __is_id_list(query: Union[ArtifactQuery, ContainerQuery, UserQuery]) -> bool:
+        if type(query) is ContainerQuery and (query.phases or query.whitelist_candidates):
+            return False
+
+        return type(getattr(query, 'id', None)) is list or type(getattr(query, 'container_id', None)) is list
+
+    async def get_records_by_ids(self, query: Union[ArtifactQuery, ContainerQuery, UserQuery],
+                                 chunk_size: Optional[int] = 100, ordered: Optional[bool] = False) -> Results:
+        """Fans an id-list query out into URL-safe chunks fetched concurrently.
+           - id lists use '_filter_id__in'; ArtifactQuery container_id lists use '_filter_container__in'
+           - Records are de-duplicated by id
+
+        Args:
+            query (Union[ArtifactQuery, ContainerQuery, UserQuery]): id (or container_id) is a list
+            chunk_size (Optional[int]): Ids per request
+            ordered (Optional[bool]): Return records in input order
+
+        Returns:
+            results (Results)"""
+        if type(query.id) is list:
+            field, filter_key, ids = 'id', '_filter_id__in', query.id
+        else:
+            field, filter_key, ids = 'container_id', '_filter_container__in', query.container_id
+
+        logger.debug(f'Getting {type(query)}, {len(ids)} record(s) by {field}...')
+
+        async def get_chunk(c: List[int]) -> Results:
+            q = deepcopy(query)
+            setattr(q, field, None)
+            setattr(q, filter_key, json.dumps(c))
+            if field == 'container_id':
+                return await self.get_records(q)
+
+            q.page_size = max(q.page_size or 0, len(c))  # At most one record per id; skip the count request
+            chunk_results = Results(data=[])
+            async for page in self.get_pages(q, page_limit=1):
+                chunk_results.success.extend(page.success)
+                chunk_results.failure.extend(page.failure)
+
+            return chunk_results
+
+        results, seen = Results(data=[]), set()
+        for chunk_results in await asyncio.gather(*[get_chunk(c) for c in chunk(dict.fromkeys(ids), chunk_size)]):
+            results.failure.extend(chunk_results.failure)
+            for r in chunk_results.success:
+                if r['id'] not in seen:
+                    seen.add(r['id'])
+                    results.success.append(r)
+
+        if ordered:
+            order = {v: i for i, v in enumerate(ids)}
+            key = 'id' if field == 'id' else 'container'
+            results.success.sort(key=lambda r: order.get(r[key], len(order)))
+
+        logger.debug('-> Complete.')
+
+        return results
+
+    def loader(self, query: Union[ArtifactQuery, ContainerQuery, UserQuery],
+               window: Optional[float] = 0.0, max_batch: Optional[int] = 100) -> RecordLoader:
+        """Batching loader for single-id lookups; one per query type.
+           - Lookups made within one loop tick (or window seconds) go out as one '_filter_id__in' query
+           - Results, including misses, are cached; see RecordLoader.clear()
+
+        Args:
+            query (Union[ArtifactQuery, ContainerQuery, UserQuery]): Query type or template; e.g. ContainerQuery
+            window (Optional[float]): Seconds to collect ids; only used when the loader is created
+            max_batch (Optional[int]): Ids per request; only used when the loader is created
+
+        Returns:
+            loader (RecordLoader)"""
+        query_type = query if type(query) is type else type(query)
+        if query_type not in self.loaders:
+            self.loaders[query_type] = RecordLoader(self, query if type(query) is not type else query(),
+                                                    window=window, max_batch=max_batch)
 
-    async def get_records(self, query: Union[ArtifactQuery, AuditQuery, ContainerQuery]) -> Results:
+        return self.loaders[query_type]
+
+    async def load_record(self, query: Union[ArtifactQuery, ContainerQuery, UserQuery]) -> Optional[dict]:
+        """Batched, cached equivalent of get_records for a single id; e.g. load_record(ContainerQuery(id=1)).
+
+        Args:
+            query (Union[ArtifactQuery, ContainerQuery, UserQuery]): Only the type and id are used
+
+        Returns:
+            record (Optional[dict]): None if the record does not exist"""
+        return await self.loader(type(query)).load(query.id)
+
+    async def get_lazy_page(self, query: Union[ArtifactQuery, ContainerQuery, UserQuery], page: int) -> Results:
+        """Fetches one page undecoded; results.success holds LazyRecord views over the page text.
+
+        Args:
+            query (Union[ArtifactQuery, ContainerQuery, UserQuery]):
+            page (int):
+
+        Returns:
+            results (Results)"""
+        results = Results(data=[])
+        try:
+            buffer = b''.join([d async for d in self.__stream('get', query.end_point, params={**query.dict(), 'page': page})])
+            results.success = LazyPage(buffer, query.data_key).records()
+        except Exception as excp:
+            results.failure.append({'end_point': query.end_point, 'page': page, 'error': str(excp)})
+            return results
+
+        if query.date_filter_field:
+            results = await self.__date_filter(query=query, results=results)
+
+        return results
+
+    async def get_records(self, query: Union[ArtifactQuery, AuditQuery, ContainerQuery],
+                          memory_limit: Optional[int] = None, lazy: Optional[bool] = False,
+                          compact: Optional[bool] = False, ordered: Optional[bool] = False) -> Results:
         """
         Args:
             query (ContainerQuery):
+            memory_limit (Optional[int]): Keep at most this many records in memory;
+                the rest spill to disk (results.success is a SpillList). Pages are
+                fetched and processed incrementally.
+            lazy (Optional[bool]): Return LazyRecord views that keep the raw page
+                text and decode a record only when it is accessed; see LazyRecord.dict().
+                Lowers resident memory at the cost of more decode CPU than the default
+            compact (Optional[bool]): Store records in a CompactStore (typed columns per key schema:
+                int64 arrays, dictionary codes, packed text); results.success holds read-only CompactRecords
+            ordered (Optional[bool]): For id-list queries; return records in input order
 
         Returns:
             results (Results)"""
+        if type(query) is AuditQuery:
+            return await self.get_audit_records(query)
+
+        if self.__is_id_list(query):
+            return await self.get_records_by_ids(query, ordered=ordered)
+
         logger.debug(f'Getting {type(query)}, record(s)...')
 
-        if type(query) is AuditQuery:
+        if not query.id:
+            page_limit = (await self.get_record_count(query)).success[0]['num_pages']
+        else:  # When we're getting a single container we can skip paging
             page_limit = 1
-        else:
-            if not query.id:
-                page_limit = (await self.get_record_count(query)).success[0]['num_pages']
-            else:  # When we're getting a single container we can skip paging
-                page_limit = 1
+
+        if lazy:
+            results = Results(data=[])
+            for page in await asyncio.gather(*[self.get_lazy_page(query, i) for i in range(0, page_limit)]):
+                results.success.extend(page.success)
+                results.failure.extend(page.failure)
+
+            logger.debug('-> Complete.')
+
+            return results
+
+        if compact:
+            results = Results(data=[])
+            results.success = CompactStore()
+            async for page in self.get_pages(query, page_limit):
+                results.success.extend(page.success)
+                results.failure.extend(page.failure)
+
+            logger.debug('-> Complete.')
+
+            return results
+
+        if memory_limit:
+            results = Results(data=[])
+            results.success = SpillList(memory_limit=memory_limit)
+            async for page in self.get_pages(query, page_limit):
+                results.success.extend(page.success)
+                results.failure.extend(page.failure)
+
+            logger.debug('-> Complete.')
+
+            return results
 
         tasks = [asyncio.create_task(self.request(method='get',
                                                   end_point=query.end_point,
@@ -114,7 +547,7 @@ class PhantomApiClient(BaseApiClient):
                                                   params={**query.dict(), 'page': i}))
                  for i in range(0, page_limit)]
 
-        results = await self.process_results(Results(data=await asyncio.gather(*tasks)), query.data_key)
+        results = await self.process_results(Results(data=await asyncio.gather(*tasks)), query.data_key, query.end_point)
 
         if query.date_filter_field:
             results = await self.__date_filter(query=query, results=results)
@@ -123,6 +556,494 @@ class PhantomApiClient(BaseApiClient):
 
         return results
 
+    async def get_containers_with_artifacts(self, query: ContainerQuery, artifact_query: Optional[ArtifactQuery] = None,
+                                            chunk_size: Optional[int] = 100,
+                                            prefetch: Optional[int] = 4) -> AsyncIterator[dict]:
+        """Streams containers with their artifacts attached (container['artifacts']).
+           - Container pages are fetched incrementally; their ids are collected in chunks
+           - Each chunk's artifacts are fetched with one '_filter_container__in' ArtifactQuery
+           - Up to prefetch chunks are in flight ahead of the consumer
+
+        Args:
+            query (ContainerQuery):
+            artifact_query (Optional[ArtifactQuery]): Additional artifact filters
+            chunk_size (Optional[int]): Containers per artifact query
+            prefetch (Optional[int]): Chunks in flight
+
+        Returns:
+            containers (AsyncIterator[dict])"""
+        logger.debug(f'Getting {type(query)}, record(s) with artifacts...')
+
+        async def join(containers: List[dict]) -> List[dict]:
+            aq = deepcopy(artifact_query) if artifact_query else ArtifactQuery()
+            setattr(aq, '_filter_container__in', str([c['id'] for c in containers]))
+            artifacts = await self.get_records(aq)
+            if artifacts.failure:
+                logger.warning(f'Failed getting artifacts: {artifacts.failure}')
+
+            parents = {}
+            for c in containers:
+                c['artifacts'] = []
+                parents[c['id']] = c
+
+            for a in artifacts.success:
+                try:
+                    parents[a['container']]['artifacts'].append(a)
+                except KeyError:
+                    pass
+
+            return containers
+
+        pending, tasks = [], deque()
+        try:
+            async for page in self.get_pages(query):
+                if page.failure:
+                    logger.warning(f'Failed getting containers: {page.failure}')
+
+                pending.extend(page.success)
+                while len(pending) >= chunk_size:
+                    tasks.append(asyncio.create_task(join(pending[:chunk_size])))
+                    pending = pending[chunk_size:]
+
+                while len(tasks) > prefetch or (tasks and tasks[0].done()):
+                    for container in await tasks.popleft():
+                        yield container
+
+            if pending:
+                tasks.append(asyncio.create_task(join(pending)))
+
+            while tasks:
+                for container in await tasks.popleft():
+                    yield container
+        finally:
+            [t.cancel() for t in tasks]
+
+        logger.debug('-> Complete.')
+
+    async def user_directory(self, ttl: Optional[float] = 300) -> UserDirectory:
+        """Loads (once) the client's user directory; see UserDirectory.
+
+        Args:
+            ttl (Optional[float]): Seconds before a background refresh; only used when the directory is created
+
+        Returns:
+            users (UserDirectory)"""
+        if self.users is None:
+            self.users = UserDirectory(self, ttl=ttl)
+
+        await self.users.fresh()
+
+        return self.users
+
+    async def get_container_phases(self, containers: List[Union[int, dict]], concurrency: Optional[int] = None,
+                                   refresh: Optional[bool] = False) -> Dict[int, List[dict]]:
+        """Phases (with tasks) for many containers; see __get_container_lists.
+
+        Args:
+            containers (List[Union[int, dict]]): Container ids or records (with update_time)
+            concurrency (Optional[int]): Requests in flight at once; default the client semaphore
+            refresh (Optional[bool]): Ignore the cache
+
+        Returns:
+            phases (Dict[int, List[dict]]): container id -> phases; missing if not found"""
+        return await self.__get_container_lists(containers, 'phases', concurrency, refresh)
+
+    async def get_container_permitted_users(self, containers: List[Union[int, dict]], concurrency: Optional[int] = None,
+                                            refresh: Optional[bool] = False) -> Dict[int, List[dict]]:
+        """Permitted users (whitelist_candidates) for many containers; see __get_container_lists.
+
+        Args:
+            containers (List[Union[int, dict]]): Container ids or records (with update_time)
+            concurrency (Optional[int]): Requests in flight at once; default the client semaphore
+            refresh (Optional[bool]): Ignore the cache
+
+        Returns:
+            users (Dict[int, List[dict]]): container id -> users; missing if not found"""
+        return await self.__get_container_lists(containers, 'whitelist_candidates', concurrency, refresh)
+
+    async def __get_container_lists(self, containers: List[Union[int, dict]], kind: str,
+                                    concurrency: Optional[int] = None, refresh: Optional[bool] = False) -> Dict[int, List[dict]]:
+        """Per-container sub-lists (/container/{id}/phases or /permitted_users) for many containers.
+           - Cached by container id and update_time; only new or changed containers are fetched again
+           - update_time for bare ids is looked up with chunked '_filter_id__in' queries
+
+        Args:
+            containers (List[Union[int, dict]]):
+            kind (str): phases|whitelist_candidates
+            concurrency (Optional[int]):
+            refresh (Optional[bool]):
+
+        Returns:
+            lists (Dict[int, List[dict]])"""
+        update_times = {c['id']: c.get('update_time') for c in containers if type(c) is dict}
+        ids = list(dict.fromkeys(c for c in containers if type(c) is not dict and c not in update_times))
+        if ids:
+            results = await self.get_records_by_ids(ContainerQuery(id=ids))
+            update_times.update({r['id']: r.get('update_time') for r in results.success})
+
+        cache = self.container_list_cache.setdefault(kind, {})
+        stale = [i for i, t in update_times.items() if refresh or i not in cache or cache[i][0] != t]
+
+        if stale:
+            logger.debug(f'Getting {kind} for {len(stale)} container(s); {len(update_times) - len(stale)} cached...')
+            sem = asyncio.Semaphore(concurrency) if concurrency else None
+
+            async def get_list(container_id: int) -> Results:
+                query = ContainerQuery(id=container_id, **{kind: True})
+                if not sem:
+                    return await self.get_records(query)
+
+                async with sem:
+                    return await self.get_records(query)
+
+            for container_id, results in zip(stale, await asyncio.gather(*[get_list(i) for i in stale])):
+                if results.failure:
+                    logger.warning(f'Failed to get {kind} for container {container_id}: {results.failure}')
+                    continue
+
+                cache[container_id] = (update_times[container_id], results.success)
+
+            logger.debug('-> Complete.')
+
+        return {i: cache[i][1] for i in update_times.keys() if i in cache}
+
+    async def __get_audit_window(self, query: AuditQuery, start: dt.datetime, end: dt.datetime) -> Results:
+        """Fetches a single audit time-window; the query's user/role/playbook/container filters are kept.
+
+        Args:
+            query (AuditQuery):
+            start (dt.datetime):
+            end (dt.datetime):
+
+        Returns:
+            results (Results)"""
+        query = deepcopy(query)
+        query.start = start.astimezone(dt.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        query.end = end.astimezone(dt.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+        tasks = [asyncio.create_task(self.request(method='get',
+                                                  end_point=query.end_point,
+                                                  request_id=uuid4().hex,
+                                                  params=query.dict()))]
+
+        return await self.process_results(Results(data=await asyncio.gather(*tasks)), query.data_key, query.end_point)
+
+    @staticmethod
+    def __window_too_big(window_results: Union[Results, BaseException]) -> bool:
+        """Whether a failed audit window should be split; timeouts and 5xx only.
+
+        Args:
+            window_results (Union[Results, BaseException]):
+
+        Returns:
+            (bool)"""
+        if isinstance(window_results, BaseException):
+            if isinstance(window_results, asyncio.TimeoutError):
+                return True
+            statuses = [getattr(window_results, 'status', None)]
+        else:
+            statuses = [f.get('status', f.get('status_code')) for f in window_results.failure if type(f) is dict]
+
+        return any(type(s) is int and (s >= 500 or s == 408) for s in statuses)
+
+    async def get_audit_records(self, query: AuditQuery,
+                                window: Optional[dt.timedelta] = dt.timedelta(days=1),
+                                min_window: Optional[dt.timedelta] = dt.timedelta(minutes=5),
+                                columnar: Optional[bool] = False,
+                                target_records: Optional[int] = 5000,
+                                concurrency: Optional[int] = 8,
+                                max_retries: Optional[int] = 32) -> Results:
+        """Fetches audit data in concurrent time-windows and merges them in time order.
+           - Windows are requested concurrency at a time; after each round the window size is set from the
+             observed density so a window holds about target_records (between min_window and window)
+           - Windows that time out or fail with a 5xx are split in half and retried, at most max_retries times
+           - Other failures (4xx, auth, connection refused) are reported without retrying
+
+        Args:
+            query (AuditQuery):
+            window (Optional[dt.timedelta]): Initial and largest window size
+            min_window (Optional[dt.timedelta]): Smallest window
+            columnar (Optional[bool]): Decode results.success into AuditColumns
+            target_records (Optional[int]): Records per window to size windows for
+            concurrency (Optional[int]): Windows in flight at once
+            max_retries (Optional[int]): Window splits across the whole call
+
+        Returns:
+            results (Results)"""
+        logger.debug(f'Getting {type(query)}, record(s)...')
+
+        from delorean import parse
+
+        end = parse(query.end, dayfirst=False, timezone='UTC').datetime if query.end else dt.datetime.now(dt.timezone.utc)
+        cursor = parse(query.start, dayfirst=False, timezone='UTC').datetime if query.start else end - dt.timedelta(days=30)
+
+        size, retries, pending = window, 0, []
+        done, results = {}, Results(data=[])
+        while pending or cursor < end:
+            batch, pending = pending[:concurrency], pending[concurrency:]
+            while len(batch) < concurrency and cursor < end:
+                batch.append((cursor, min(cursor + size, end)))
+                cursor = batch[-1][1]
+
+            windows = await asyncio.gather(*[self.__get_audit_window(query, *w) for w in batch], return_exceptions=True)
+            records, seconds = 0, 0.0
+            for (ws, we), window_results in zip(batch, windows):
+                if not isinstance(window_results, BaseException) and not window_results.failure:
+                    done[ws] = window_results.success
+                    records += len(window_results.success)
+                    seconds += (we - ws).total_seconds()
+                elif we - ws > min_window and retries < max_retries and self.__window_too_big(window_results):
+                    logger.debug(f'Audit window {ws.isoformat()} - {we.isoformat()} failed; splitting...')
+                    mid = ws + (we - ws) / 2
+                    pending.extend([(ws, mid), (mid, we)])
+                    retries += 1
+                    if self.metrics:
+                        self.metrics.retries.inc(end_point=query.end_point)
+                elif isinstance(window_results, BaseException):
+                    results.failure.append({'start': ws.isoformat(), 'end': we.isoformat(), 'error': str(window_results)})
+                else:
+                    results.failure.extend(window_results.failure)
+
+            if records and seconds:
+                size = min(max(dt.timedelta(seconds=target_records * seconds / records), min_window), window)
+
+        if columnar:
+            results.success = AuditColumns()
+
+        seen = set()
+        for ws in sorted(done.keys()):
+            records, previous, seen = done[ws], seen, set()
+            time_key = next((k for k in records[0].keys() if k.lower() == 'time'), None) if records else None
+            if time_key:
+                records = sorted(records, key=lambda r: r[time_key])
+
+            unique = []
+            for r in records:  # Adjacent windows share a boundary
+                key = record_key(r)
+                if key not in previous:
+                    unique.append(r)
+                seen.add(key)
+
+            results.success.extend(unique)
+            del done[ws]
+
+        logger.debug('-> Complete.')
+
+        return results
+
+    async def __stream(self, method: str, end_point: str, params: Optional[dict] = None) -> AsyncIterator[bytes]:
+        """Yields the response body in chunks as it arrives; holds a semaphore slot until exhausted.
+           - The body is read undecoded and gunzipped/inflated here, so the span counts both wire and decoded bytes
+
+        Args:
+            method (str):
+            end_point (str):
+            params (Optional[dict]):
+
+        Returns:
+            chunks (AsyncIterator[bytes])"""
+        span = self.tracer.start(method, end_point, params=params) if self.tracer else None
+        if self.metrics:
+            self.metrics.in_flight.inc()
+
+        try:
+            async with self.limit or AsyncExitStack(), self.sem:
+                async with self.session.request(method=method,
+                                                url=f'{self.cfg["URI"]["Base"]}{end_point}',
+                                                params=params,
+                                                auto_decompress=False) as response:
+                    response.raise_for_status()
+                    encoding = response.headers.get('Content-Encoding', 'identity').lower()
+                    if encoding not in ('identity', 'gzip', 'deflate'):
+                        raise ValueError(f'Unsupported Content-Encoding: {encoding}')
+
+                    if span:
+                        span.encoding = None if encoding == 'identity' else encoding
+                        span.bytes_in_wire = 0  # Counted below rather than taken from Content-Length
+                    decoder = None
+                    async for data in response.content.iter_any():  # Doesn't fire on_response_chunk_received
+                        if span:
+                            span.bytes_in_wire += len(data)
+                        if encoding != 'identity':
+                            if not decoder:  # gzip or zlib-wrapped deflate (auto-detected), else raw deflate
+                                raw = encoding == 'deflate' and data[0] & 0x0F != 8
+                                decoder = zlib.decompressobj(-zlib.MAX_WBITS if raw else zlib.MAX_WBITS | 32)
+                            data = decoder.decompress(data)
+                        if span:
+                            span.bytes_in += len(data)
+                            span.t_body = time.perf_counter()
+                        if data:
+                            yield data
+
+                    if decoder:
+                        data = decoder.flush()
+                        if span:
+                            span.bytes_in += len(data)
+                        if data:
+                            yield data
+        except Exception as excp:
+            if span:
+                self.tracer.finish(span, excp)
+                span = None
+            raise
+        finally:
+            if span:
+                self.tracer.finish(span)
+            if self.metrics:
+                self.metrics.in_flight.dec()
+
+    async def stream_audit_records(self, query: AuditQuery) -> AsyncIterator[AuditRecord]:
+        """Requests audit data as csv and yields AuditRecords as rows arrive; memory use is
+           independent of the time range.
+
+        Args:
+            query (AuditQuery):
+
+        Returns:
+            records (AsyncIterator[AuditRecord])"""
+        logger.debug(f'Streaming {type(query)}, record(s)...')
+        query = deepcopy(query)
+        query.format = 'csv'
+
+        decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        header, partial, quotes = None, '', 0
+
+        async for data in self.__stream('get', query.end_point, params=query.dict()):
+            lines = (partial + decoder.decode(data)).split('\n')
+            partial = lines.pop()
+
+            pending = []
+            for line in lines:
+                pending.append(line)
+                quotes += line.count('"')
+                if quotes % 2:  # Quoted field continues on the next line
+                    continue
+
+                row = next(csv.reader(['\n'.join(pending)]), None)
+                pending, quotes = [], 0
+                if not row:
+                    continue
+                elif not header:
+                    header = [normalize_key(k) for k in row]
+                else:
+                    yield AuditRecord(record=dict(zip(header, row)))
+
+            partial, quotes = '\n'.join([*pending, partial]), 0
+
+        partial += decoder.decode(b'', final=True)
+        if header and partial.strip():
+            for row in csv.reader([partial]):
+                yield AuditRecord(record=dict(zip(header, row)))
+
+        logger.debug('-> Complete.')
+
+    async def export_audit_records(self, query: AuditQuery, path: str) -> int:
+        """Requests audit data as csv and writes the response body straight to a file.
+
+        Args:
+            query (AuditQuery):
+            path (str): Output file
+
+        Returns:
+            size (int): Bytes written"""
+        logger.debug(f'Exporting {type(query)}, record(s) to {path}...')
+        query = deepcopy(query)
+        query.format = 'csv'
+
+        size = 0
+        with open(path, 'wb') as sink:
+            async for data in self.__stream('get', query.end_point, params=query.dict()):
+                size += sink.write(data)
+
+        logger.debug('-> Complete.')
+
+        return size
+
+    async def follow_audit(self, query: Optional[AuditQuery] = None,
+                           start: Optional[Union[str, dt.datetime]] = None,
+                           overlap: Optional[dt.timedelta] = dt.timedelta(seconds=30),
+                           min_interval: Optional[float] = 1.0,
+                           max_interval: Optional[float] = 60.0) -> AsyncIterator[AuditRecord]:
+        """Tails audit data; yields new audit events as they occur.
+           - Each poll only requests (watermark - overlap) -> now; history isn't re-downloaded
+           - Records in the overlap are de-duplicated with a seen-set pruned to the overlap window
+           - The poll interval doubles while idle (up to max_interval) and resets on new events
+
+        Args:
+            query (Optional[AuditQuery]): user/role/playbook/container filters; start/end are ignored
+            start (Optional[Union[str, dt.datetime]]): Initial watermark; default now
+            overlap (Optional[dt.timedelta]): Re-checked span behind the watermark for late/boundary records
+            min_interval (Optional[float]): Seconds
+            max_interval (Optional[float]): Seconds
+
+        Returns:
+            records (AsyncIterator[AuditRecord])"""
+        query = query or AuditQuery()
+        watermark = to_datetime(start) or dt.datetime.now(dt.timezone.utc)
+        seen: Dict[Union[tuple, str], dt.datetime] = {}
+        interval = min_interval
+
+        while True:
+            now = dt.datetime.now(dt.timezone.utc)
+            try:
+                results = await self.__get_audit_window(query, watermark - overlap, now)
+            except Exception as excp:
+                logger.warning(f'Audit poll failed: {excp}')
+                results = None
+
+            new = []
+            if results and not results.failure:
+                for r in results.success:
+                    key = record_key(r)
+                    if key in seen:
+                        continue
+
+                    record = AuditRecord(record=r)
+                    seen[key] = record.time or now
+                    new.append(record)
+
+                new.sort(key=lambda x: x.time or now)
+                if new:
+                    watermark = max(watermark, max(r.time or now for r in new))
+
+                seen = {k: v for k, v in seen.items() if v >= watermark - overlap}
+            elif results:
+                logger.warning(f'Audit poll failed: {results.failure}')
+
+            for record in new:
+                yield record
+
+            interval = min_interval if new else min(interval * 2, max_interval)
+            await asyncio.sleep(interval)
+
+    async def pipeline(self, query: Union[ArtifactQuery, ContainerQuery],
+                       predicate: Optional[Callable[[dict], bool]] = None,
+                       action: Union[str, Callable[[dict], Any]] = 'delete',
+                       values: Optional[dict] = None,
+                       read_concurrency: Optional[int] = 4,
+                       write_concurrency: Optional[int] = 10,
+                       checkpoint: Optional[str] = None,
+                       dry_run: Optional[bool] = False) -> Results:
+        """Deletes/updates (or passes to a callback) matching records while the query is still being read.
+           - Actions start as soon as the first page is filtered; memory is bounded by pages in flight
+           - See Pipeline
+
+        Args:
+            query (Union[ArtifactQuery, ContainerQuery]):
+            predicate (Optional[Callable[[dict], bool]]): Client-side filter; default every record
+            action (Union[str, Callable[[dict], Any]]): delete|update or a (async) callback taking the record
+            values (Optional[dict]): Fields to post for 'update'
+            read_concurrency (Optional[int]): Id-range partitions scanned at once
+            write_concurrency (Optional[int]): Actions in flight at once
+            checkpoint (Optional[str]): Path of a json checkpoint file; resumes if it exists
+            dry_run (Optional[bool]): Match records without acting; results.success holds the matches
+
+        Returns:
+            results (Results)"""
+        return await Pipeline(self, query, predicate=predicate, action=action, values=values,
+                              read_concurrency=read_concurrency, write_concurrency=write_concurrency,
+                              checkpoint=checkpoint, dry_run=dry_run).run()
+
     async def delete_records(self, query: Union[List[ArtifactQuery], List[ContainerQuery]]) -> Results:
         """
 
@@ -144,7 +1065,7 @@ class PhantomApiClient(BaseApiClient):
 
         logger.debug('-> Complete.')
 
-        return await self.process_results(results)
+        return await self.process_results(results, end_point=query[0].end_point if query else '')
 
     async def update_records(self, requests: List[Union[ContainerRequest, ArtifactRequest]]) -> Results:
         """
@@ -169,7 +1090,36 @@ class PhantomApiClient(BaseApiClient):
 
         logger.debug('-> Complete.')
 
-        return await self.process_results(results)
+        return await self.process_results(results, end_point=requests[0].end_point if requests else '')
+
+    async def buffer_updates(self, requests: Union[List[Union[ContainerRequest, ArtifactRequest]],
+                                                   ContainerRequest, ArtifactRequest]) -> List[asyncio.Future]:
+        """Queues updates in the write-behind buffer; changes to the same record are merged
+           and sent as a single, minimal POST.
+
+        Args:
+            requests (Union[
+        ContainerRequest, ArtifactRequest, List[Union[ContainerRequest, ArtifactRequest]]]):
+
+        Returns:
+            futures (List[asyncio.Future]): Each resolves to its record's response once flushed"""
+        if self.write_buffer is None:
+            self.write_buffer = WriteBuffer(self)
+
+        if not type(requests) is list:
+            requests = [requests]
+
+        return [await self.write_buffer.put(r) for r in requests]
+
+    async def flush(self) -> Results:
+        """Sends all pending buffered updates.
+
+        Returns:
+            results (Results)"""
+        if self.write_buffer is None:
+            return Results(data=[])
+
+        return await self.write_buffer.flush()
 
     async def create_artifacts(self, containers: Union[List[ContainerRequest], ContainerRequest]) -> Tuple[
         Results, List[ContainerRequest]]:
@@ -189,7 +1139,7 @@ class PhantomApiClient(BaseApiClient):
         #                                               request_id=a.data['request_id'],
         #                                               json=a.dict())) for a in containers]
 
-        results = await self.process_results(Results(data=await asyncio.gather(*tasks)))
+        results = await self.process_results(Results(data=await asyncio.gather(*tasks)), end_point='/artifact')
 
         [a.update_id(next((_['id'] for _ in results.success if _['request_id'] == a.data['request_id']), None))
          for x in containers for a in x.artifacts]
@@ -211,7 +1161,7 @@ class PhantomApiClient(BaseApiClient):
                                                   request_id=c.data['request_id'],
                                                   json=c.dict())) for c in containers]
 
-        container_results = await self.process_results(Results(data=await asyncio.gather(*tasks)))
+        container_results = await self.process_results(Results(data=await asyncio.gather(*tasks)), end_point='/container')
         logger.debug('-> Complete.')
 
         # print('container_results:\n', container_results)
@@ -225,6 +1175,277 @@ class PhantomApiClient(BaseApiClient):
 
         return container_results, containers
 
+    async def create_annotations(self, items: Union[Iterable[Union[Comment, Note, Pin]], AsyncIterable[Union[Comment, Note, Pin]]],
+                                 window: Optional[int] = 100) -> Results:
+        """Creates notes, comments and pins in bulk.
+           - items may be an async iterable; at most window requests are pending while it is consumed
+           - Requests go through the client semaphore
+           - Each result record carries 'index', the item's position in items
+
+        Args:
+            items (Union[Iterable[Union[Comment, Note, Pin]], AsyncIterable[Union[Comment, Note, Pin]]]):
+            window (Optional[int]): Requests created ahead of completion
+
+        Returns:
+            results (Results)"""
+        end_points = {Comment: '/container_comment', Note: '/note', Pin: '/container_pin'}
+
+        if not hasattr(items, '__aiter__'):
+            async def aiter(iterable: Iterable[Any]) -> AsyncIterator[Any]:
+                for i in iterable:
+                    yield i
+
+            items = aiter(items)
+
+        logger.debug('Creating annotation(s)...')
+
+        index: Dict[str, int] = {}  # request_id -> item position
+        pending, responses = set(), []
+        n, used = 0, set()
+        async for item in items:
+            used.add(end_points[type(item)])
+            request_id = uuid4().hex
+            index[request_id] = n
+            n += 1
+            pending.add(asyncio.create_task(self.request(method='post',
+                                                         end_point=end_points[type(item)],
+                                                         request_id=request_id,
+                                                         json=item.dict)))
+            if len(pending) >= window:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                responses.extend(t.result() for t in done)
+
+        if pending:
+            responses.extend(await asyncio.gather(*pending))
+
+        results = await self.process_results(Results(data=responses), end_point=','.join(sorted(used)))
+        for r in [*results.success, *results.failure]:
+            if type(r) is dict and r.get('request_id') in index:
+                r['index'] = index[r['request_id']]
+
+        logger.debug('-> Complete.')
+
+        return results
+
+    async def launch_runs(self, requests: Union[List[Union[ActionRunRequest, PlaybookRunRequest]], ActionRunRequest, PlaybookRunRequest],
+                          concurrency: Optional[int] = None) -> Results:
+        """Launches playbook/action runs in bulk; each request's id is set to its run id.
+
+        Args:
+            requests (Union[List[Union[ActionRunRequest, PlaybookRunRequest]], ActionRunRequest, PlaybookRunRequest]):
+            concurrency (Optional[int]): Launches in flight at once; default the client semaphore
+
+        Returns:
+            results (Results)"""
+        if type(requests) is not list:
+            requests = [requests]
+
+        logger.debug(f'Launching {len(requests)} run(s)...')
+
+        sem = asyncio.Semaphore(concurrency) if concurrency else None
+        request_ids = [uuid4().hex for _ in requests]
+
+        async def launch(request: Union[ActionRunRequest, PlaybookRunRequest], request_id: str) -> Any:
+            if not sem:
+                return await self.request(method='post', end_point=request.end_point, request_id=request_id, json=request.dict())
+
+            async with sem:
+                return await self.request(method='post', end_point=request.end_point, request_id=request_id, json=request.dict())
+
+        responses = await asyncio.gather(*[launch(r, i) for r, i in zip(requests, request_ids)])
+        results = await self.process_results(Results(data=responses), end_point=requests[0].end_point if requests else '')
+
+        index = {r.get('request_id'): r for r in results.success}
+        [r.update_id(index.get(i, {}).get(r.id_key)) for r, i in zip(requests, request_ids)]
+
+        logger.debug('-> Complete.')
+
+        return results
+
+    async def poll_runs(self, query: Union[ActionRunQuery, PlaybookRunQuery],
+                        min_interval: Optional[float] = 1, max_interval: Optional[float] = 30,
+                        timeout: Optional[float] = None, app_runs: Optional[bool] = True) -> AsyncIterator[dict]:
+        """Polls pending runs together and yields each one as it completes.
+           - One '_filter_id__in' query per poll (chunked for long id lists) instead of one request per run
+           - The interval resets to min_interval when runs complete and doubles up to max_interval while none do
+           - Action runs are yielded with their app runs (results) under 'app_runs'
+
+        Args:
+            query (Union[ActionRunQuery, PlaybookRunQuery]): id is the list of run ids to follow
+            min_interval (Optional[float]): Seconds
+            max_interval (Optional[float]): Seconds
+            timeout (Optional[float]): Seconds; stop polling with runs still pending
+            app_runs (Optional[bool]): Attach app runs to completed action runs
+
+        Returns:
+            runs (AsyncIterator[dict])"""
+        ids = query.id if type(query.id) is list else [query.id]
+        pending = dict.fromkeys(i for i in ids if i)
+        interval = min_interval
+        deadline = time.monotonic() + timeout if timeout else None
+
+        logger.debug(f'Polling {len(pending)} {type(query).__name__} run(s)...')
+
+        while pending:
+            q = deepcopy(query)
+            q.id = list(pending.keys())
+            results = await self.get_records_by_ids(q)
+
+            complete = [r for r in results.success if r.get('status') in RUN_COMPLETE and r['id'] in pending]
+            if complete and app_runs and type(query) is ActionRunQuery:
+                app_results = await self.get_records(AppRunQuery(filter={'_filter_action_run__in': json.dumps([r['id'] for r in complete])}))
+                by_run = {}
+                for a in app_results.success:
+                    by_run.setdefault(a.get('action_run'), []).append(a)
+                complete = [{**r, 'app_runs': by_run.get(r['id'], [])} for r in complete]
+
+            for r in complete:
+                del pending[r['id']]
+                yield r
+
+            if not pending:
+                break
+
+            if deadline and time.monotonic() >= deadline:
+                logger.warning(f'Stopped polling; {len(pending)} run(s) still pending: {list(pending.keys())}')
+                break
+
+            interval = min_interval if complete else min(interval * 2, max_interval)
+            if deadline:
+                interval = min(interval, max(deadline - time.monotonic(), 0))
+            await asyncio.sleep(interval)
+
+        logger.debug('-> Complete.')
+
+    async def resolve_source_data_identifiers(self, sdis: List[str],
+                                              chunk_size: Optional[int] = 100) -> Tuple[Dict[str, dict], Results]:
+        """Looks up existing containers by source_data_identifier.
+           - Identifiers already in the local cache are not queried again
+           - The rest are resolved with chunked '_filter_source_data_identifier__in' queries
+           - Identifiers in a chunk whose query failed are unknown, not missing; they're reported in failed
+
+        Args:
+            sdis (List[str]):
+            chunk_size (Optional[int]): Identifiers per query
+
+        Returns:
+            results (Tuple[Dict[str, dict], Results]): source_data_identifier -> container record (missing if
+                not found); failed lookups as {'source_data_identifiers': [...], 'error': [...]} in failure"""
+        unresolved = [s for s in dict.fromkeys(sdis) if s not in self.sdi_cache]
+        failed = Results(data=[])
+
+        if unresolved:
+            logger.debug(f'Resolving {len(unresolved)} source_data_identifier(s)...')
+            chunks = list(chunk(unresolved, chunk_size))
+            queries = [ContainerQuery(page_size=chunk_size, filter={'_filter_source_data_identifier__in': json.dumps(c)})
+                       for c in chunks]
+
+            for c, results in zip(chunks, await asyncio.gather(*[self.get_records(q) for q in queries])):
+                if results.failure:
+                    failed.failure.append({'source_data_identifiers': c, 'error': results.failure})
+                    continue
+
+                self.sdi_cache.update({r['source_data_identifier']: r for r in results.success})
+            logger.debug(f'-> Complete; {len(failed.failure)} of {len(chunks)} lookup(s) failed.')
+
+        return {s: self.sdi_cache[s] for s in sdis if s in self.sdi_cache}, failed
+
+    @staticmethod
+    def __container_delta(container: ContainerRequest, existing: dict) -> dict:
+        """Requested (explicitly set, non-None) fields that differ from an existing container record.
+           - Fields left at their dataclass default are not requested, so they never overwrite the existing value
+           - Fields the server doesn't return (e.g. run_automation) are skipped
+           - data keys are compared individually and sent merged into the existing data
+
+        Args:
+            container (ContainerRequest):
+            existing (dict):
+
+        Returns:
+            delta (dict)"""
+        delta = {}
+        for k, v in container.dict(sort_order=None).items():
+            if k == 'data':
+                current = existing.get('data') or {}
+                v = {dk: dv for dk, dv in v.items() if dk != 'request_id'}
+                if any(current.get(dk) != dv for dk, dv in v.items()):
+                    delta[k] = {**current, **v}
+            elif k in container.fields_set and k in existing and existing[k] != v:
+                delta[k] = v
+
+        return delta
+
+    async def upsert_containers(self, containers: Union[List[ContainerRequest], ContainerRequest],
+                                chunk_size: Optional[int] = 100) -> Tuple[Results, List[ContainerRequest]]:
+        """Creates containers that don't exist yet (by source_data_identifier) and
+           updates existing containers only where the requested fields differ.
+           - Every requested non-None field is compared against the existing container; only differences are sent
+           - Artifacts are created for new containers only
+           - Containers whose existence lookup failed are neither created nor updated; they're reported in failure
+
+        Args:
+            containers (Union[List[ContainerRequest], ContainerRequest]):
+            chunk_size (Optional[int]): Identifiers per existence query
+
+        Returns:
+            results (Tuple[Results, List[ContainerRequest]])"""
+        if type(containers) is not list:
+            containers = [containers]
+
+        logger.debug('Upserting container(s)...')
+        existing, lookup = await self.resolve_source_data_identifiers([c.source_data_identifier for c in containers
+                                                                       if c.source_data_identifier], chunk_size)
+        unknown = {sdi: f['error'] for f in lookup.failure for sdi in f['source_data_identifiers']}
+
+        new, seen, updates, skipped = [], {}, {}, []
+        for c in containers:
+            sdi = c.source_data_identifier
+            if sdi in unknown:  # Can't tell whether it exists; creating it could duplicate it
+                skipped.append({'source_data_identifier': sdi, 'error': unknown[sdi]})
+            elif sdi in existing:
+                c.update_id(existing[sdi]['id'])
+                delta = self.__container_delta(c, existing[sdi])
+                if delta:
+                    updates[c.id] = {**updates.get(c.id, {}), **delta}
+            elif sdi and sdi in seen:  # Duplicate within this batch; created once
+                seen[sdi].append(c)
+            else:
+                new.append(c)
+                if sdi:
+                    seen[sdi] = [c]
+
+        results = Results(data=[])
+        if new:
+            results, new = await self.create_containers(new)
+            for c in new:
+                if c.id and c.source_data_identifier:
+                    self.sdi_cache[c.source_data_identifier] = {**c.dict(sort_order=None), 'id': c.id}
+                    [d.update_id(c.id) for d in seen[c.source_data_identifier][1:]]
+
+        if updates:
+            tasks = [asyncio.create_task(self.request(method='post',
+                                                      end_point=f'/container/{k}',
+                                                      request_id=uuid4().hex,
+                                                      json=v)) for k, v in updates.items()]
+            update_results = await self.process_results(Results(data=await asyncio.gather(*tasks)), end_point='/container/{id}')
+            results.success.extend(update_results.success)
+            results.failure.extend(update_results.failure)
+
+            updated = {r.get('id') for r in update_results.success}
+            for c in containers:
+                if c.id in updates and c.id in updated:
+                    cached = self.sdi_cache[c.source_data_identifier]
+                    data = {**(cached.get('data') or {}), **updates[c.id].get('data', {})}
+                    self.sdi_cache[c.source_data_identifier] = {**cached, **updates[c.id], 'data': data}
+
+        if skipped:
+            logger.error(f'Skipped {len(skipped)} container(s); source_data_identifier lookup failed.')
+            results.failure.extend(skipped)
+
+        logger.debug(f'-> Complete; {len(new)} created, {len(updates)} updated.')
+
+        return results, containers
+
 
 if __name__ == '__main__':
     print(__doc__)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: User Directory
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Union
+
+from phantom_api_client.models import UserQuery
+
+logger = logging.getLogger(__name__)
+
+
+class UserDirectory:
+    """In-Memory User Directory
+       - Loads every user once (paged UserQuery) into id -> user and username -> user indexes
+       - Once ttl seconds old, lookups still answer from the current indexes while a refresh runs in the background"""
+
+    def __init__(self, client, query: Optional[UserQuery] = None, ttl: Optional[float] = 300):
+        """
+        Args:
+            client (PhantomApiClient):
+            query (Optional[UserQuery]): Default all normal and automation users
+            ttl (Optional[float]): Seconds before a background refresh"""
+        self.client = client
+        self.query = query or UserQuery()
+        self.ttl = ttl
+        self.by_id: Dict[int, dict] = {}
+        self.by_name: Dict[str, dict] = {}
+        self.loaded: Optional[float] = None  # monotonic
+        self.task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    async def load(self) -> 'UserDirectory':
+        """(Re)loads every user; concurrent callers share one load."""
+        if not self.task or self.task.done():
+            self.task = asyncio.ensure_future(self.__load())
+
+        await asyncio.shield(self.task)
+
+        return self
+
+    async def __load(self) -> None:
+        logger.debug('Loading user directory...')
+
+        results = await self.client.get_records(self.query)
+        if results.failure:
+            logger.warning(f'User directory refresh failed; keeping {len(self.by_id)} user(s): {results.failure}')
+            return
+
+        self.by_id = {u['id']: u for u in results.success}
+        self.by_name = {u['username']: u for u in results.success if u.get('username')}
+        self.loaded = time.monotonic()
+
+        logger.debug('-> Complete.')
+
+    async def fresh(self) -> None:
+        """Loads on first use; starts a background refresh once ttl has passed."""
+        if self.loaded is None:
+            await self.load()
+        elif self.ttl and time.monotonic() - self.loaded >= self.ttl and (not self.task or self.task.done()):
+            self.task = asyncio.ensure_future(self.__load())
+
+    async def get(self, user: Union[int, str]) -> Optional[dict]:
+        """
+        Args:
+            user (Union[int, str]): id or username
+
+        Returns:
+            user (Optional[dict])"""
+        await self.fresh()
+
+        return self.by_id.get(user) if type(user) is int else self.by_name.get(user)
+
+    async def get_many(self, users: Iterable[Union[int, str]]) -> Dict[Union[int, str], dict]:
+        """
+        Args:
+            users (Iterable[Union[int, str]]): ids and/or usernames
+
+        Returns:
+            users (Dict[Union[int, str], dict]): Missing if unknown"""
+        await self.fresh()
+
+        found = {}
+        for u in users:
+            user = self.by_id.get(u) if type(u) is int else self.by_name.get(u)
+            if user is not None:
+                found[u] = user
+
+        return found
+
+    async def resolve(self, records: List[dict], key: Optional[str] = 'owner_id',
+                      field: Optional[str] = 'owner_name') -> List[dict]:
+        """Adds the username for each record's user id; e.g. container results.success.
+
+        Args:
+            records (List[dict]):
+            key (Optional[str]): Field holding the user id
+            field (Optional[str]): Field to set; None when unknown
+
+        Returns:
+            records (List[dict]): The same records"""
+        await self.fresh()
+
+        by_id = self.by_id
+        for r in records:
+            user = by_id.get(r.get(key))
+            r[field] = user.get('username') if user else None
+
+        return records
+
+    def close(self) -> None:
+        if self.task and not self.task.done():
+            self.task.cancel()
+
+
+if __name__ == '__main__':
+    print(__doc__)
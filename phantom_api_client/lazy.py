@@ -0,0 +1,133 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Lazy Records
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+
+import json
+import logging
+import re
+from array import array
+from collections.abc import Mapping
+from json.decoder import scanstring
+from typing import Any, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DECODER = json.JSONDecoder()
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class LazyPage:
+    """Raw Response Page
+       - Keeps the raw page text instead of decoded records
+       - One pass with the C json scanner records each record's span; records are decoded one at a time and dropped
+       - A record is decoded again only when one of its fields is accessed; the last one is kept
+       - Saves memory, not CPU: indexing costs about as much as json.loads and each accessed record is decoded
+         again, so reading a few fields of every record takes roughly 1.5-2x the CPU of eager decoding"""
+
+    def __init__(self, buffer: Union[bytes, str], data_key: Optional[str] = 'data'):
+        """
+        Args:
+            buffer (Union[bytes, str]): Raw json response body
+            data_key (Optional[str]): Top-level key holding the list of records; None if the body is one record"""
+        self.buffer = buffer if type(buffer) is str else buffer.decode()
+        self.record_start = array('q')
+        self.record_end = array('q')
+        self.last: Tuple[int, Optional[dict]] = (-1, None)  # (record, decoded)
+
+        try:
+            self.index(data_key)
+        except (IndexError, StopIteration):
+            raise json.JSONDecodeError('Malformed page', self.buffer, 0) from None
+
+    def __next(self, i: int) -> int:
+        """Position of the next token after i; skips whitespace and one separating comma."""
+        i = WHITESPACE.match(self.buffer, i).end()
+        if self.buffer[i] == ',':
+            i = WHITESPACE.match(self.buffer, i + 1).end()
+
+        return i
+
+    def index(self, data_key: Optional[str]) -> None:
+        text, ws, scan = self.buffer, WHITESPACE.match, DECODER.scan_once
+        i = ws(text, 0).end()
+        if not data_key:
+            self.record_start.append(i)
+            self.record_end.append(scan(text, i)[1])
+            return
+
+        i = ws(text, i + 1).end()  # Past '{'
+        while text[i] != '}':
+            key, i = scanstring(text, i + 1)
+            i = ws(text, ws(text, i).end() + 1).end()  # Past ':'
+            if key == data_key and text[i] == '[':
+                i = ws(text, i + 1).end()
+                while text[i] != ']':
+                    end = scan(text, i)[1]
+                    self.record_start.append(i)
+                    self.record_end.append(end)
+                    i = self.__next(end)
+                i += 1
+            else:
+                i = scan(text, i)[1]
+            i = self.__next(i)
+
+    def __len__(self) -> int:
+        return len(self.record_end)
+
+    def record(self, record: int) -> dict:
+        """Decoded record; cached until another record is decoded."""
+        if self.last[0] != record:
+            self.last = (record, DECODER.scan_once(self.buffer, self.record_start[record])[0])
+
+        return self.last[1]
+
+    def records(self) -> List['LazyRecord']:
+        return [LazyRecord(self, i) for i in range(0, len(self))]
+
+
+class LazyRecord(Mapping):
+    """Read-only view of one record in a LazyPage; the record is decoded only when accessed."""
+    __slots__ = ('page', 'record')
+
+    def __init__(self, page: LazyPage, record: int):
+        self.page = page
+        self.record = record
+
+    def __getitem__(self, key: str) -> Any:
+        return self.page.record(self.record)[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.page.record(self.record)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.page.record(self.record))
+
+    def __len__(self) -> int:
+        return len(self.page.record(self.record))
+
+    def dict(self) -> dict:
+        """Decodes the full record; a new dict on each call."""
+        return json.loads(self.page.buffer[self.page.record_start[self.record]:self.page.record_end[self.record]])
+
+    def __repr__(self) -> str:
+        return f'LazyRecord({self.dict()})'
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Record Loader
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+
+import asyncio
+import logging
+from copy import deepcopy
+from typing import Dict, List, Optional, Union
+
+from phantom_api_client.models import ArtifactQuery, ContainerQuery, UserQuery
+
+logger = logging.getLogger(__name__)
+
+
+class RecordLoader:
+    """Batching Single-Id Loader
+       - Ids requested within one event-loop tick (or window seconds) are sent as one '_filter_id__in' query
+       - Concurrent requests for the same id share one future
+       - Found records and misses (None) are cached until clear()"""
+
+    def __init__(self, client, query: Union[ArtifactQuery, ContainerQuery, UserQuery],
+                 window: Optional[float] = 0.0, max_batch: Optional[int] = 100):
+        """
+        Args:
+            client (PhantomApiClient):
+            query (Union[ArtifactQuery, ContainerQuery, UserQuery]): Template for each batch; e.g. ContainerQuery()
+            window (Optional[float]): Seconds to collect ids before dispatching; 0 is the current loop tick
+            max_batch (Optional[int]): Dispatch immediately once this many ids are queued"""
+        self.client = client
+        self.query = query
+        self.window = window
+        self.max_batch = max_batch
+        self.cache: Dict[int, asyncio.Future] = {}
+        self.queue: Dict[int, asyncio.Future] = {}
+        self.handle: Optional[asyncio.Handle] = None
+
+    def load(self, id: int) -> asyncio.Future:
+        """
+        Args:
+            id (int):
+
+        Returns:
+            future (asyncio.Future): Resolves to the record or None if it does not exist; cancelling it
+                                     leaves the shared, cached future running for other callers"""
+        future = self.cache.get(id)
+        if future is not None and future.done() and (future.cancelled() or future.exception()):
+            del self.cache[id]
+            future = None
+
+        if future is None:
+            loop = asyncio.get_event_loop()
+            future = self.cache[id] = self.queue[id] = loop.create_future()
+            future.add_done_callback(lambda f: self.__evict(id, f))
+
+            if len(self.queue) >= self.max_batch:
+                self.dispatch()
+            elif not self.handle:
+                self.handle = loop.call_later(self.window, self.dispatch) if self.window else loop.call_soon(self.dispatch)
+
+        return asyncio.shield(future)
+
+    def __evict(self, id: int, future: asyncio.Future) -> None:
+        """Drops a cancelled or failed future so the next load() retries the id."""
+        if (future.cancelled() or future.exception()) and self.cache.get(id) is future:
+            del self.cache[id]
+
+    async def load_many(self, ids: List[int]) -> List[Optional[dict]]:
+        return list(await asyncio.gather(*[self.load(i) for i in ids]))
+
+    def dispatch(self) -> None:
+        if self.handle:
+            self.handle.cancel()
+            self.handle = None
+
+        queue, self.queue = self.queue, {}
+        if queue:
+            asyncio.ensure_future(self.__fetch(queue))
+
+    async def __fetch(self, queue: Dict[int, asyncio.Future]) -> None:
+        logger.debug(f'Loading {len(queue)} {type(self.query).__name__} id(s)...')
+
+        query = deepcopy(self.query)
+        query.id = list(queue.keys())
+        try:
+            results = await self.client.get_records_by_ids(query, chunk_size=self.max_batch)
+        except Exception as excp:
+            for i, future in queue.items():
+                if not future.done():
+                    future.set_exception(excp)
+            return
+
+        records = {r['id']: r for r in results.success}
+        for i, future in queue.items():
+            record = records.get(i)
+            if record is None and results.failure:  # Unknown; not a confirmed miss
+                self.cache.pop(i, None)
+            if not future.done():
+                future.set_result(record)
+
+        logger.debug('-> Complete.')
+
+    def clear(self, id: Optional[int] = None) -> None:
+        """Drops one cached id, or all of them."""
+        if id is None:
+            self.cache = {**self.queue}
+        else:
+            self.cache.pop(id, None)
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Metrics
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+
+import asyncio
+import logging
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from phantom_api_client.tracing import Span
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+ID_PATTERN = re.compile(r'/(\d+|\[[^/]*\])(?=/|$)')
+
+
+def endpoint_label(end_point: str) -> str:
+    """'/container/123/artifacts' -> '/container/{id}/artifacts'; keeps label cardinality bounded."""
+    return ID_PATTERN.sub('/{id}', end_point)
+
+
+class Metric:
+    TYPE = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(k, '')) for k in self.labels)
+
+    def format_labels(self, key: Tuple[str, ...], extra: Optional[Dict[str, str]] = None) -> str:
+        pairs = [*zip(self.labels, key), *(extra or {}).items()]
+        if not pairs:
+            return ''
+
+        return '{' + ','.join(f'{k}="{str(v)}"' for k, v in pairs) + '}'
+
+    def snapshot(self) -> dict:
+        return {','.join(k) if k else '': v for k, v in self.values.items()}
+
+    def exposition(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.TYPE}']
+        lines.extend(f'{self.name}{self.format_labels(k)} {v}' for k, v in self.values.items())
+
+        return lines
+
+
+class Counter(Metric):
+    TYPE = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self.key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    TYPE = 'gauge'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self.key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        self.values[self.key(labels)] = value
+
+
+class Histogram(Metric):
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+        self.counts: Dict[Tuple[str, ...], List[int]] = {}
+        self.sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self.key(labels)
+        if key not in self.counts:
+            self.counts[key] = [0] * (len(self.buckets) + 1)
+            self.sums[key] = 0.0
+
+        self.counts[key][bisect_left(self.buckets, value)] += 1
+        self.sums[key] += value
+
+    def snapshot(self) -> dict:
+        return {','.join(k) if k else '': {'count': sum(c), 'sum': self.sums[k], 'buckets': dict(zip([*self.buckets, '+Inf'], c))}
+                for k, c in self.counts.items()}
+
+    def exposition(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.TYPE}']
+        for k, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip([*self.buckets, '+Inf'], counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{self.format_labels(k, {"le": bound})} {cumulative}')
+            lines.append(f'{self.name}_sum{self.format_labels(k)} {self.sums[k]}')
+            lines.append(f'{self.name}_count{self.format_labels(k)} {cumulative}')
+
+        return lines
+
+
+class MetricsRegistry:
+    """In-Process Metrics
+       - Fed by the client's request path (see PhantomApiClient.enable_metrics)
+       - Export with snapshot() or exposition() (Prometheus text format), or serve() over HTTP"""
+
+    def __init__(self, prefix: Optional[str] = 'phantom_api_client'):
+        self.prefix = prefix
+        self.metrics: Dict[str, Metric] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+
+        self.requests = self.counter('requests_total', 'Requests by end_point/method/status.', ('end_point', 'method', 'status'))
+        self.bytes_in = self.counter('bytes_in_total', 'Response body bytes received.', ('end_point',))
+        self.bytes_out = self.counter('bytes_out_total', 'Request body bytes sent.', ('end_point',))
+        self.records = self.counter('records_decoded_total', 'Records decoded by process_results.')
+        self.retries = self.counter('retries_total', 'Requests retried.', ('end_point',))
+        self.coalesced = self.counter('requests_coalesced_total', 'GETs served by an identical in-flight request.', ('end_point',))
+        self.errors = self.counter('errors_total', 'Requests raising an exception.', ('end_point', 'method'))
+        self.compressed_bytes = self.counter('compressed_body_bytes_total', 'Compressed body bytes; decoded and on the wire.', ('direction', 'stage'))
+        self.compression_ratio = self.gauge('compression_ratio', 'Decoded/wire bytes of compressed bodies.', ('direction',))
+        self.in_flight = self.gauge('in_flight', 'Requests in flight; includes those waiting on the semaphore.')
+        self.semaphore_wait = self.histogram('semaphore_wait_seconds', 'Time waiting on the request semaphore.')
+        self.latency = self.histogram('request_duration_seconds', 'Request/page latency.', ('end_point', 'method'))
+
+    def name(self, name: str) -> str:
+        return f'{self.prefix}_{name}' if self.prefix else name
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self.metrics.setdefault(self.name(name), Counter(self.name(name), documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Gauge:
+        return self.metrics.setdefault(self.name(name), Gauge(self.name(name), documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = BUCKETS) -> Histogram:
+        return self.metrics.setdefault(self.name(name), Histogram(self.name(name), documentation, labels, buckets))
+
+    def observe_span(self, span: Span) -> None:
+        """Tracer callback"""
+        if span.method == 'process':
+            self.records.inc(span.records or 0)
+            return
+
+        end_point = endpoint_label(span.end_point)
+        if span.error and not span.status:
+            self.errors.inc(end_point=end_point, method=span.method)
+        else:
+            self.requests.inc(end_point=end_point, method=span.method, status=span.status)
+
+        self.bytes_in.inc(span.bytes_in, end_point=end_point)
+        if span.encoding and span.bytes_in_wire and span.bytes_in and not span.error:  # Both sizes known
+            self.observe_compression('in', span.bytes_in, span.bytes_in_wire)
+        self.bytes_out.inc(span.bytes_out, end_point=end_point)
+        self.semaphore_wait.observe(span.queued)
+        self.latency.observe(span.duration, end_point=end_point, method=span.method)
+
+    def observe_compression(self, direction: str, decoded: int, wire: int) -> None:
+        """
+        Args:
+            direction (str): in|out
+            decoded (int): Body bytes before compression/after decompression
+            wire (int): Compressed body bytes"""
+        self.compressed_bytes.inc(decoded, direction=direction, stage='decoded')
+        self.compressed_bytes.inc(wire, direction=direction, stage='wire')
+        self.compression_ratio.set(self.compressed_bytes.values[(direction, 'decoded')] /
+                                   max(self.compressed_bytes.values[(direction, 'wire')], 1), direction=direction)
+
+    def snapshot(self) -> dict:
+        return {k: m.snapshot() for k, m in self.metrics.items()}
+
+    def exposition(self) -> str:
+        return '\n'.join(line for m in self.metrics.values() for line in m.exposition()) + '\n'
+
+    async def serve(self, host: Optional[str] = '127.0.0.1', port: Optional[int] = 9464) -> asyncio.AbstractServer:
+        """Serves exposition() to any HTTP GET; e.g. http://127.0.0.1:9464/metrics
+
+        Args:
+            host (Optional[str]):
+            port (Optional[int]):
+
+        Returns:
+            server (asyncio.AbstractServer)"""
+
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            try:
+                await reader.readuntil(b'\r\n\r\n')
+                body = self.exposition().encode()
+                writer.write(b'HTTP/1.1 200 OK\r\n'
+                             b'Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n'
+                             b'Content-Length: ' + str(len(body)).encode() + b'\r\n'
+                             b'Connection: close\r\n\r\n' + body)
+                await writer.drain()
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                pass
+            finally:
+                writer.close()
+
+        self.server = await asyncio.start_server(handle, host=host, port=port)
+        logger.debug(f'Serving metrics on http://{host}:{port}/metrics')
+
+        return self.server
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -18,13 +18,47 @@ copies or substantial portions of the Software.
 You should have received a copy of the SSPL along with this program.
 If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
 
-from phantom_api_client.models.artifact import ArtifactRequest
-from phantom_api_client.models.attachment import Attachment
-from phantom_api_client.models.cef import Cef
-from phantom_api_client.models.comment import Comment
-from phantom_api_client.models.container import ContainerRequest
-from phantom_api_client.models.custom_fields import CustomFields
-from phantom_api_client.models.exceptions import InvalidCombinationError, InvalidOptionError
-from phantom_api_client.models.note import Note
-from phantom_api_client.models.pin import Pin
-from phantom_api_client.models.query import ArtifactQuery, AuditQuery, ContainerQuery, Query, UserQuery
+import importlib
+from typing import Any, List
+
+# Exported name -> submodule; submodules (and their dependencies) are imported on first access
+MODELS = {'ActionRunQuery':          'query',
+          'ActionRunRequest':        'run',
+          'AppRunQuery':             'query',
+          'ArtifactQuery':           'query',
+          'ArtifactRequest':         'artifact',
+          'Attachment':              'attachment',
+          'AuditColumns':            'audit',
+          'AuditQuery':              'query',
+          'AuditRecord':             'audit',
+          'Cef':                     'cef',
+          'Comment':                 'comment',
+          'ContainerQuery':          'query',
+          'ContainerRequest':        'container',
+          'CustomFields':            'custom_fields',
+          'InvalidCombinationError': 'exceptions',
+          'InvalidOptionError':      'exceptions',
+          'Note':                    'note',
+          'Pin':                     'pin',
+          'PlaybookRunQuery':        'query',
+          'PlaybookRunRequest':      'run',
+          'Query':                   'query',
+          'RUN_COMPLETE':            'run',
+          'UserQuery':               'query'}
+
+__all__ = list(MODELS.keys())
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = MODELS[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+
+    value = globals()[name] = getattr(importlib.import_module(f'{__name__}.{module}'), name)
+
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals().keys(), *__all__})
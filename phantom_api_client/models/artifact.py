@@ -27,12 +27,13 @@ from copy import deepcopy
 
 from base_api_client.models.record import Record, sort_dict
 from phantom_api_client.models.cef import Cef
+from phantom_api_client.models.tracked import TrackedFields
 
 logger = logging.getLogger(__name__)
 
 
 @dataclass
-class ArtifactRequest(Record):
+class ArtifactRequest(TrackedFields, Record):
     cef: Union[Cef, dict, None] = None  # Common Event Format
     cef_types: Union[Dict[str, List[str]], None] = None
     container_id: Union[int, None] = None
@@ -76,6 +77,7 @@ class ArtifactRequest(Record):
         Returns:
             dct (dict):"""
         dct = deepcopy(self.__dict__)
+        del dct['_fields_set']
 
         del dct['id']
 
@@ -19,11 +19,40 @@ You should have received a copy of the SSPL along with this program.
 If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
 
 import datetime as dt
-from dataclasses import dataclass
-from typing import Union
+from array import array
+from dataclasses import dataclass, fields
+from typing import Dict, Iterator, List, Optional, Union
 
 from base_api_client.models.record import Record
 
+EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+MICROSECOND = dt.timedelta(microseconds=1)
+
+
+def normalize_key(key: str) -> str:
+    return key.lower().replace(' ', '_')
+
+
+def to_datetime(value: Union[str, dt.datetime, None]) -> Optional[dt.datetime]:
+    """
+    Args:
+        value (Union[str, dt.datetime, None]): ISO 8601 Date-Time
+
+    Returns:
+        (Optional[dt.datetime]): UTC"""
+    if not value:
+        return None
+
+    if type(value) is not dt.datetime:
+        try:
+            value = dt.datetime.fromisoformat(value[:-1] + '+00:00' if value[-1] == 'Z' else value)
+        except ValueError:
+            from delorean import parse
+
+            value = parse(value, dayfirst=False, timezone='UTC').datetime
+
+    return value.replace(tzinfo=dt.timezone.utc) if not value.tzinfo else value
+
 
 @dataclass
 class AuditRecord(Record):
@@ -45,7 +74,123 @@ class AuditRecord(Record):
     user_id: Union[int, None] = None
 
     def __post_init__(self):
-        self.record = {k.lower().replace(' ', '_'): v for k, v in self.record.items()}
+        self.record = {normalize_key(k): v for k, v in self.record.items()}
         super(AuditRecord, self).load(**self.record)
         del self.record
-        # todo: convert datetime, populate fields
+        self.time = to_datetime(self.time)
+
+        for k in ('object_id', 'related_object_id', 'user_id'):  # csv values are strings
+            if type(getattr(self, k)) is str:
+                setattr(self, k, int(getattr(self, k)) if getattr(self, k).strip() else None)
+
+
+class AuditColumns:
+    """Columnar Audit Records
+       - Decodes raw audit json directly into one array per field
+       - Keys are normalized once per distinct raw key, not once per record
+       - time: array('q') of UTC epoch microseconds; zero-copy to numpy.frombuffer(..., dtype='datetime64[us]')
+       - object_id, related_object_id, user_id: array('q'); missing values are -1
+       - object_type, user, audit_source: dictionary-encoded; array('l') of codes into a list of values
+       - Remaining fields are plain lists
+       - Row access (AuditRecord) is built on demand via indexing/iteration"""
+    INTEGERS = ('object_id', 'related_object_id', 'user_id')
+    CATEGORIES = ('object_type', 'user', 'audit_source')
+    FIELDS = tuple(f.name for f in fields(AuditRecord) if f.name != 'record')
+
+    def __init__(self):
+        self.length = 0
+        self.time = array('q')
+        self.integers: Dict[str, array] = {k: array('q') for k in self.INTEGERS}
+        self.codes: Dict[str, array] = {k: array('l') for k in self.CATEGORIES}
+        self.categories: Dict[str, List[Optional[str]]] = {k: [] for k in self.CATEGORIES}
+        self.strings: Dict[str, list] = {k: [] for k in self.FIELDS
+                                         if k != 'time' and k not in self.INTEGERS and k not in self.CATEGORIES}
+
+    @classmethod
+    def from_records(cls, records: List[dict]) -> 'AuditColumns':
+        """
+        Args:
+            records (List[dict]): Raw audit json records
+
+        Returns:
+            columns (AuditColumns)"""
+        columns = cls()
+        columns.extend(records)
+
+        return columns
+
+    def extend(self, records: List[dict]) -> None:
+        keys: Dict[str, str] = {}  # raw key -> normalized key
+        lookups = {k: {v: i for i, v in enumerate(self.categories[k])} for k in self.CATEGORIES}
+        time, integers, codes, categories, strings = self.time, self.integers, self.codes, self.categories, self.strings
+
+        for record in records:
+            row = {}
+            for k, v in record.items():
+                try:
+                    row[keys[k]] = v
+                except KeyError:
+                    keys[k] = normalize_key(k)
+                    row[keys[k]] = v
+
+            t = to_datetime(row.get('time'))
+            time.append((t - EPOCH) // MICROSECOND if t else -1)
+
+            for k in self.INTEGERS:
+                v = row.get(k)
+                integers[k].append(int(v) if v not in (None, '') else -1)
+
+            for k in self.CATEGORIES:
+                v = row.get(k)
+                try:
+                    codes[k].append(lookups[k][v])
+                except KeyError:
+                    lookups[k][v] = len(categories[k])
+                    categories[k].append(v)
+                    codes[k].append(lookups[k][v])
+
+            for k, column in strings.items():
+                column.append(row.get(k))
+
+        self.length += len(records)
+
+    def column(self, name: str) -> Union[array, list]:
+        """
+        Args:
+            name (str): AuditRecord field name
+
+        Returns:
+            (Union[array, list]): Raw column; integer codes for dictionary-encoded fields"""
+        if name == 'time':
+            return self.time
+        elif name in self.INTEGERS:
+            return self.integers[name]
+        elif name in self.CATEGORIES:
+            return self.codes[name]
+
+        return self.strings[name]
+
+    def value(self, name: str, index: int) -> Union[int, str, dt.datetime, None]:
+        if name == 'time':
+            return EPOCH + self.time[index] * MICROSECOND if self.time[index] != -1 else None
+        elif name in self.INTEGERS:
+            return self.integers[name][index] if self.integers[name][index] != -1 else None
+        elif name in self.CATEGORIES:
+            return self.categories[name][self.codes[name][index]]
+
+        return self.strings[name][index]
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int) -> AuditRecord:
+        if index < 0:
+            index += self.length
+
+        if not 0 <= index < self.length:
+            raise IndexError(index)
+
+        return AuditRecord(record={k: self.value(k, index) for k in self.FIELDS})
+
+    def __iter__(self) -> Iterator[AuditRecord]:
+        return (self[i] for i in range(0, self.length))
@@ -28,12 +28,13 @@ from copy import deepcopy
 from base_api_client.models import Record, sort_dict
 from phantom_api_client.models import ArtifactRequest
 from phantom_api_client.models.custom_fields import CustomFields
+from phantom_api_client.models.tracked import TrackedFields
 
 logger = logging.getLogger(__name__)
 
 
 @dataclass
-class ContainerRequest(Record):
+class ContainerRequest(TrackedFields, Record):
     asset_id: Union[int, None] = None
     close_time: Union[str, None] = None
     container_type: Union[str, None] = 'default'
@@ -99,6 +100,7 @@ class ContainerRequest(Record):
         Returns:
             dct (dict):"""
         dct = deepcopy(self.__dict__)
+        del dct['_fields_set']
         del dct['id']
         del dct['artifacts']
         # todo: implement
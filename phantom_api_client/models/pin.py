@@ -51,3 +51,7 @@ class Pin:
 
         if error:
             raise NotImplementedError
+
+    @property
+    def dict(self):
+        return dict(sorted({k: v for k, v in self.__dict__.items() if v is not None}.items()))
@@ -21,14 +21,16 @@ If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
 import datetime as dt
 import logging
 from dataclasses import dataclass
-from typing import List, Optional, Union
+from typing import List, Optional, TYPE_CHECKING, Union
 
 from copy import deepcopy
-from delorean import Delorean, parse
 
 from base_api_client.models import Record, sort_dict
 from phantom_api_client.models import InvalidCombinationError
 
+if TYPE_CHECKING:
+    from delorean import Delorean
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,8 +60,8 @@ class Query(Record):
     sort: Optional[str] = None
     order: Optional[str] = None
     # Extras
-    date_filter_start: Optional[Union[Delorean, str, None]] = None  # YYYY-MM-DDTHH:MM:SS.ffffff
-    date_filter_end: Optional[Union[Delorean, str, None]] = None
+    date_filter_start: Optional[Union['Delorean', str, None]] = None  # YYYY-MM-DDTHH:MM:SS.ffffff
+    date_filter_end: Optional[Union['Delorean', str, None]] = None
     date_filter_field: Optional[str] = None  # One of:
 
     def __post_init__(self):
@@ -76,6 +78,9 @@ class Query(Record):
             self.load(**self.filter)
             del self.filter
 
+        if self.date_filter_start or self.date_filter_end:
+            from delorean import Delorean, parse  # Only loaded when date filtering
+
         if self.date_filter_start:
             self.date_filter_start = parse(self.date_filter_start, dayfirst=False, timezone='UTC')
 
@@ -375,7 +380,7 @@ class ContainerQuery(Query):
 
 @dataclass
 class UserQuery(Query):
-    id: int = None
+    id: Optional[Union[int, List[int]]] = None
 
     def __post_init__(self):
         if not self.filter:
@@ -402,5 +407,76 @@ class UserQuery(Query):
         return data_key
 
 
+
+@dataclass
+class PlaybookRunQuery(Query):
+    id: Optional[Union[int, List[int]]] = None
+
+    @property
+    def end_point(self):
+        if self.id and not type(self.id) is list:
+            ep = f'/playbook_run/{self.id}'
+        else:
+            ep = '/playbook_run'
+
+        return ep
+
+    @property
+    def data_key(self):
+        if self.id and not type(self.id) is list:
+            data_key = None
+        else:
+            data_key = 'data'
+
+        return data_key
+
+
+@dataclass
+class ActionRunQuery(Query):
+    id: Optional[Union[int, List[int]]] = None
+
+    @property
+    def end_point(self):
+        if self.id and not type(self.id) is list:
+            ep = f'/action_run/{self.id}'
+        else:
+            ep = '/action_run'
+
+        return ep
+
+    @property
+    def data_key(self):
+        if self.id and not type(self.id) is list:
+            data_key = None
+        else:
+            data_key = 'data'
+
+        return data_key
+
+
+@dataclass
+class AppRunQuery(Query):
+    """e.g. AppRunQuery(filter={'_filter_action_run__in': '[1, 2]'})"""
+    id: Optional[Union[int, List[int]]] = None
+
+    @property
+    def end_point(self):
+        if self.id and not type(self.id) is list:
+            ep = f'/app_run/{self.id}'
+        else:
+            ep = '/app_run'
+
+        return ep
+
+    @property
+    def data_key(self):
+        if self.id and not type(self.id) is list:
+            data_key = None
+        else:
+            data_key = 'data'
+
+        return data_key
+
+
 if __name__ == '__main__':
     print(__doc__)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Models.Run
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+from copy import deepcopy
+
+from base_api_client.models import Record, sort_dict
+
+logger = logging.getLogger(__name__)
+
+RUN_COMPLETE = ('success', 'failed', 'cancelled')
+
+
+@dataclass
+class PlaybookRunRequest(Record):
+    """
+    Attributes:
+        container_id (int):
+        playbook_id (Union[int, str]): id or 'repo/playbook_name'
+        scope (Union[str, List[int]]): all|new or a list of artifact ids
+        run (bool):
+        inputs (Optional[dict]): Input playbooks only
+
+    References:
+        https://my.phantom.us/4.6/docs/rest/playbook_run"""
+    container_id: int = None
+    playbook_id: Union[int, str] = None
+    scope: Union[str, List[int]] = 'new'
+    run: bool = True
+    inputs: Optional[dict] = None
+    # Extras
+    id: int = None
+
+    def update_id(self, playbook_run_id: int):
+        self.id = playbook_run_id
+
+    def dict(self, cleanup: bool = True, dct: Optional[dict] = None, sort_order: str = 'asc') -> dict:
+        """
+        Args:
+            cleanup (Optional[bool]):
+            dct (Optional[dict]):
+            sort_order (Optional[str]): ASC | DESC
+
+        Returns:
+            dct (dict):"""
+        dct = deepcopy(self.__dict__)
+        del dct['id']
+
+        if cleanup:
+            dct = {k: v for k, v in dct.items() if v is not None}
+
+        if sort_order:
+            dct = sort_dict(dct, reverse=True if sort_order.lower() == 'desc' else False)
+
+        return dct
+
+    @property
+    def end_point(self):
+        return '/playbook_run'
+
+    @property
+    def id_key(self):
+        return 'playbook_run_id'
+
+
+@dataclass
+class ActionRunRequest(Record):
+    """
+    Attributes:
+        action (str): e.g. 'geolocate ip'
+        container_id (int):
+        name (str):
+        targets (List[dict]): [{'assets': ['maxmind'], 'parameters': [{'ip': '1.1.1.1'}], 'app_id': 1}]
+        type (Optional[str]): e.g. 'investigate'
+
+    References:
+        https://my.phantom.us/4.6/docs/rest/action_run"""
+    action: str = None
+    container_id: int = None
+    name: str = None
+    targets: List[dict] = field(default_factory=list)
+    type: Optional[str] = None
+    # Extras
+    id: int = None
+
+    def update_id(self, action_run_id: int):
+        self.id = action_run_id
+
+    def dict(self, cleanup: bool = True, dct: Optional[dict] = None, sort_order: str = 'asc') -> dict:
+        """
+        Args:
+            cleanup (Optional[bool]):
+            dct (Optional[dict]):
+            sort_order (Optional[str]): ASC | DESC
+
+        Returns:
+            dct (dict):"""
+        dct = deepcopy(self.__dict__)
+        del dct['id']
+
+        if cleanup:
+            dct = {k: v for k, v in dct.items() if v is not None}
+
+        if sort_order:
+            dct = sort_dict(dct, reverse=True if sort_order.lower() == 'desc' else False)
+
+        return dct
+
+    @property
+    def end_point(self):
+        return '/action_run'
+
+    @property
+    def id_key(self):
+        return 'action_run_id'
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Models.Tracked
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+
+from dataclasses import fields
+from typing import FrozenSet
+
+
+class TrackedFields:
+    """Remembers which dataclass fields were set explicitly
+       - Constructor arguments (positional or keyword) and any later assignment count as set
+       - Fields left at their default do not; passing the default value explicitly does"""
+
+    def __new__(cls, *args, **kwargs):
+        self = super().__new__(cls)
+        names = [f.name for f in fields(cls) if f.init]
+        self.__dict__['_fields_set'] = {*names[:len(args)], *kwargs}
+
+        return self
+
+    def __setattr__(self, name, value):
+        if name in self.__dict__:  # First assignment is the dataclass __init__ filling in the field
+            self.__dict__['_fields_set'].add(name)
+
+        super().__setattr__(name, value)
+
+    @property
+    def fields_set(self) -> FrozenSet[str]:
+        return frozenset(self.__dict__.get('_fields_set', ()))
+
+
+if __name__ == '__main__':
+    print(__doc__)
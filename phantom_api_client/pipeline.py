@@ -0,0 +1,196 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Pipeline
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+
+import asyncio
+import json
+import logging
+import os
+from copy import deepcopy
+from typing import Any, Callable, List, Optional, Union
+from uuid import uuid4
+
+from base_api_client import Results
+from phantom_api_client.models import ArtifactQuery, ContainerQuery
+
+logger = logging.getLogger(__name__)
+
+
+class Pipeline:
+    """Streaming Query -> Predicate -> Action
+       - Records are read in id order with keyset paging ('_filter_id__gt'); deletes/updates
+         made by the pipeline do not shift later pages
+       - The id range is split into read_concurrency partitions scanned concurrently; each
+         prefetches its next page while the current page's actions run
+       - Actions (delete, update or a callback) share one write_concurrency limit
+       - The checkpoint file records each partition's last completed id; re-running resumes from it"""
+
+    def __init__(self, client, query: Union[ArtifactQuery, ContainerQuery],
+                 predicate: Optional[Callable[[dict], bool]] = None,
+                 action: Union[str, Callable[[dict], Any]] = 'delete',
+                 values: Optional[dict] = None,
+                 read_concurrency: Optional[int] = 4,
+                 write_concurrency: Optional[int] = 10,
+                 checkpoint: Optional[str] = None,
+                 dry_run: Optional[bool] = False):
+        """
+        Args:
+            client (PhantomApiClient):
+            query (Union[ArtifactQuery, ContainerQuery]): Server-side filters; page_size is the scan page size
+            predicate (Optional[Callable[[dict], bool]]): Client-side filter; default every record
+            action (Union[str, Callable[[dict], Any]]): delete|update or a (async) callback taking the record
+            values (Optional[dict]): Fields to post for 'update'
+            read_concurrency (Optional[int]): Id-range partitions scanned at once
+            write_concurrency (Optional[int]): Actions in flight at once
+            checkpoint (Optional[str]): Path of a json checkpoint file
+            dry_run (Optional[bool]): Match records without acting; results.success holds the matches"""
+        if action == 'update' and not values:
+            raise ValueError("The 'update' action requires values.")
+
+        self.client = client
+        self.query = query
+        self.predicate = predicate
+        self.action = action
+        self.values = values
+        self.read_concurrency = read_concurrency
+        self.write_sem = asyncio.Semaphore(write_concurrency)
+        self.checkpoint = checkpoint
+        self.dry_run = dry_run
+        self.partitions: List[List[int]] = []  # [first id, last id, last completed id]
+        self.results = Results(data=[])
+
+    async def run(self) -> Results:
+        self.partitions = self.load_checkpoint() or await self.split()
+        logger.debug(f'Running pipeline over {len(self.partitions)} partition(s){"; dry run" if self.dry_run else ""}...')
+
+        await asyncio.gather(*[self.scan(p) for p in self.partitions])
+
+        logger.debug('-> Complete.')
+
+        return self.results
+
+    async def fetch(self, after: int, last: Optional[int] = None, size: Optional[int] = None, order: Optional[str] = 'asc') -> List[dict]:
+        query = deepcopy(self.query)
+        query.page, query.sort, query.order = 0, 'id', order
+        query.page_size = size or query.page_size
+        if after is not None:
+            setattr(query, '_filter_id__gt', after)
+        if last is not None:
+            setattr(query, '_filter_id__lte', last)
+
+        response = await self.client.request(method='get', end_point=query.end_point, request_id=uuid4().hex,
+                                             params=query.dict())
+        results = await self.client.process_results(Results(data=[response]), query.data_key, query.end_point)
+        if results.failure:
+            raise RuntimeError(f'Pipeline read failed: {results.failure}')
+
+        return results.success
+
+    async def split(self) -> List[List[int]]:
+        first, last = await asyncio.gather(self.fetch(None, size=1), self.fetch(None, size=1, order='desc'))
+        if not first:
+            return []
+
+        lo, hi = first[0]['id'], last[0]['id']
+        step = max((hi - lo + 1) // self.read_concurrency, 1)
+        bounds = [*range(lo - 1, hi, step)][:self.read_concurrency] + [hi]
+
+        return [[bounds[i], bounds[i + 1], bounds[i]] for i in range(0, len(bounds) - 1)]
+
+    def load_checkpoint(self) -> Optional[List[List[int]]]:
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return None
+
+        with open(self.checkpoint) as f:
+            partitions = json.load(f)['partitions']
+
+        logger.debug(f'Resuming from checkpoint {self.checkpoint}')
+
+        return partitions
+
+    def save_checkpoint(self) -> None:
+        if not self.checkpoint or self.dry_run:
+            return
+
+        with open(f'{self.checkpoint}.tmp', 'w') as f:
+            json.dump({'partitions': self.partitions}, f)
+        os.replace(f'{self.checkpoint}.tmp', self.checkpoint)
+
+    async def scan(self, partition: List[int]) -> None:
+        first, last, done = partition
+        if done >= last:
+            return
+
+        size = self.query.page_size
+        page = asyncio.ensure_future(self.fetch(done, last))
+        try:
+            while page:
+                records = await page
+                page = asyncio.ensure_future(self.fetch(records[-1]['id'], last)) if len(records) >= size else None
+
+                matched = [r for r in records if self.match(r)]
+                if self.dry_run:
+                    self.results.success.extend(matched)
+                else:
+                    await asyncio.gather(*[self.act(r) for r in matched])
+
+                partition[2] = records[-1]['id'] if records else last
+                self.save_checkpoint()
+        finally:
+            if page:
+                page.cancel()
+
+        partition[2] = last
+        self.save_checkpoint()
+
+    def match(self, record: dict) -> bool:
+        if self.query.date_filter_field:
+            from delorean import parse
+
+            if not self.query.date_filter_start <= parse(record[self.query.date_filter_field], dayfirst=False) <= self.query.date_filter_end:
+                return False
+
+        return not self.predicate or bool(self.predicate(record))
+
+    async def act(self, record: dict) -> None:
+        end_point = f'{"/container" if type(self.query) is ContainerQuery else "/artifact"}/{record["id"]}'
+
+        async with self.write_sem:
+            if callable(self.action):
+                try:
+                    result = self.action(record)
+                    if asyncio.iscoroutine(result):
+                        result = await result
+                    self.results.success.append({'id': record['id'], 'result': result})
+                except Exception as excp:
+                    self.results.failure.append({'id': record['id'], 'error': repr(excp)})
+                return
+
+            if self.action == 'delete':
+                response = await self.client.request(method='delete', end_point=end_point, request_id=uuid4().hex)
+            else:
+                response = await self.client.request(method='post', end_point=end_point, request_id=uuid4().hex, json=self.values)
+
+        results = await self.client.process_results(Results(data=[response]), end_point=end_point)
+        self.results.success.extend(results.success)
+        self.results.failure.extend(results.failure)
+
+
+if __name__ == '__main__':
+    print(__doc__)
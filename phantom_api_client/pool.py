@@ -0,0 +1,163 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Client Pool
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadSafeSemaphore:
+    """Semaphore for coroutines on different event loops/threads; FIFO.
+       - Waiters are woken on their own loop with call_soon_threadsafe"""
+
+    def __init__(self, value: int):
+        self.value = value
+        self.lock = threading.Lock()
+        self.waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    async def acquire(self) -> bool:
+        with self.lock:
+            if self.value > 0 and not self.waiters:
+                self.value -= 1
+                return True
+
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self.waiters.append(waiter)
+
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self.lock:
+                try:
+                    self.waiters.remove(waiter)
+                except ValueError:  # Already granted; __grant passes the permit on unless it already ran
+                    pass
+
+            if waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+        return True
+
+    def release(self) -> None:
+        with self.lock:
+            while self.waiters:
+                loop, future = self.waiters.popleft()
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(self.__grant, future)
+                    return
+
+            self.value += 1
+
+    def __grant(self, future: asyncio.Future) -> None:
+        if future.done():  # Cancelled after being granted
+            self.release()
+        else:
+            future.set_result(True)
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, exc_type: None, exc_val: None, exc_tb: None) -> None:
+        self.release()
+
+
+class ClientPool:
+    """Loop-Affine Client Pool
+       - get() returns the PhantomApiClient for the running event loop; created on first use
+       - Clients are held until release() (on their loop) or close(); clients of loops that closed
+         without release() are dropped, with a warning, on the next get()
+       - Each client has its own session/connection pool; the configuration is loaded once and shared
+       - max_in_flight bounds requests across all clients/threads, on top of each client's own semaphore"""
+
+    def __init__(self, cfg: Union[str, dict], max_in_flight: Optional[int] = None, **kwargs):
+        """
+        Args:
+            cfg (Union[str, dict]): See PhantomApiClient
+            max_in_flight (Optional[int]): Requests in flight across all clients
+            **kwargs: Passed to PhantomApiClient"""
+        self.cfg = cfg
+        self.kwargs = kwargs
+        self.limit = ThreadSafeSemaphore(max_in_flight) if max_in_flight else None
+        self.clients: Dict[asyncio.AbstractEventLoop, Any] = {}  # loop -> client; the client's session keeps the loop alive
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def get(self):
+        """Client for the running event loop; call from a coroutine.
+
+        Returns:
+            client (PhantomApiClient)"""
+        from phantom_api_client.client import PhantomApiClient
+
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            client = self.clients.get(loop)
+            cfg = self.cfg
+            closed = [lp for lp in self.clients if lp.is_closed()]
+            for lp in closed:  # Finished without release(); the session can no longer be closed on its loop
+                del self.clients[lp]
+
+        if closed:
+            logger.warning(f'Dropped {len(closed)} client(s) of closed loop(s); call release() before a loop ends.')
+
+        if client is None:
+            client = PhantomApiClient(cfg, **self.kwargs)
+            client.limit = self.limit
+            with self.lock:
+                self.clients[loop] = client
+                if type(self.cfg) is not dict and type(client.cfg) is dict:
+                    self.cfg = client.cfg  # Later clients reuse the parsed configuration
+
+            logger.debug(f'Created client for loop {id(loop)}; {len(self.clients)} client(s).')
+
+        return client
+
+    async def release(self) -> None:
+        """Flushes and closes the running loop's client; e.g. before the thread's loop ends."""
+        with self.lock:
+            client = self.clients.pop(asyncio.get_running_loop(), None)
+
+        if client:
+            await client.__aexit__(None, None, None)
+
+    def close(self) -> None:
+        """Closes every client on its own loop; call from outside those loops."""
+        with self.lock:
+            clients, self.clients = list(self.clients.items()), {}
+
+        for loop, client in clients:
+            if loop.is_closed():
+                logger.warning(f'Loop {id(loop)} closed before its client; call release() before closing the loop.')
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.__aexit__(None, None, None), loop).result()
+            else:
+                loop.run_until_complete(client.__aexit__(None, None, None))
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Results
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+
+import json
+import logging
+import mmap
+import tempfile
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class SpillList(Sequence):
+    """Disk-Spilling Record List
+       - The first memory_limit records are kept in memory
+       - The rest are appended to a temporary ndjson segment file; read back through mmap
+       - An offset table gives O(1) random access by index
+       - Supports iteration, len() and indexing like the plain list it replaces in Results"""
+
+    def __init__(self, memory_limit: Optional[int] = 10000, records: Optional[Iterable[Any]] = None, directory: Optional[str] = None):
+        """
+        Args:
+            memory_limit (Optional[int]): Records to keep in memory
+            records (Optional[Iterable[Any]]):
+            directory (Optional[str]): Where to create the segment file; default system temp"""
+        self.memory_limit = memory_limit
+        self.directory = directory
+        self.memory: list = []
+        self.offsets = array('q')  # Start of each spilled record; plus end of the last
+        self.segment = None
+        self.map: Optional[mmap.mmap] = None
+
+        if records:
+            self.extend(records)
+
+    def append(self, record: Any) -> None:
+        if len(self.memory) < self.memory_limit:
+            self.memory.append(record)
+            return
+
+        if not self.segment:
+            self.segment = tempfile.TemporaryFile(dir=self.directory)
+            self.offsets.append(0)
+            logger.debug(f'Spilling records beyond {self.memory_limit} to disk...')
+
+        size = self.segment.write(json.dumps(record, separators=(',', ':')).encode() + b'\n')
+        self.offsets.append(self.offsets[-1] + size)
+
+    def extend(self, records: Iterable[Any]) -> None:
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return len(self.memory) + max(len(self.offsets) - 1, 0)
+
+    def __read(self, index: int) -> Any:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        if not self.map or len(self.map) < end:
+            self.segment.flush()
+            if self.map:
+                self.map.close()
+            self.map = mmap.mmap(self.segment.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return json.loads(self.map[start:end])
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if type(index) is slice:
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+
+        if index < len(self.memory):
+            return self.memory[index]
+
+        return self.__read(index - len(self.memory))
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self.memory
+        for i in range(0, max(len(self.offsets) - 1, 0)):
+            yield self.__read(i)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __repr__(self) -> str:
+        return f'SpillList(memory={len(self.memory)}, spilled={max(len(self.offsets) - 1, 0)})'
+
+    def close(self) -> None:
+        if self.map:
+            self.map.close()
+            self.map = None
+
+        if self.segment:
+            self.segment.close()
+            self.segment = None
+
+    def __del__(self):
+        self.close()
+
+
+NULL = -2 ** 63  # IntColumn marker for None
+
+
+class IntColumn:
+    """int64 column; None is stored as NULL"""
+    __slots__ = ('data',)
+
+    def __init__(self):
+        self.data = array('q')
+
+    def append(self, value: Any) -> bool:
+        if value is None:
+            value = NULL
+        elif type(value) is not int or not NULL < value < 2 ** 63:
+            return False
+
+        self.data.append(value)
+
+        return True
+
+    def __getitem__(self, index: int) -> Optional[int]:
+        value = self.data[index]
+
+        return None if value == NULL else value
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class Json(str):
+    """Marks a CodeColumn value as the JSON text of a nested dict/list"""
+    __slots__ = ()
+
+
+class CodeColumn:
+    """Dictionary-encoded column; an array('l') of codes into a list of distinct values
+       - Nested dicts/lists are kept as JSON text and decoded on access, so callers never share them"""
+    __slots__ = ('codes', 'values', 'lookup', 'limit')
+
+    def __init__(self, limit: Optional[int] = None):
+        self.codes = array('l')
+        self.values: list = []
+        self.lookup: dict = {}
+        self.limit = limit
+
+    def append(self, value: Any) -> bool:
+        if type(value) is str:
+            key = value
+        elif type(value) in (dict, list):
+            value = Json(json.dumps(value))
+            key = (Json, value)
+        else:
+            key = (type(value), value)
+
+        try:
+            code = self.lookup[key]
+        except KeyError:
+            if self.limit is not None and len(self.values) >= self.limit:
+                return False
+
+            code = self.lookup[key] = len(self.values)
+            self.values.append(value)
+
+        self.codes.append(code)
+
+        return True
+
+    def __getitem__(self, index: int) -> Any:
+        value = self.values[self.codes[index]]
+
+        return json.loads(value) if type(value) is Json else value
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class TextColumn:
+    """Free-text column; utf-8 entries packed into one bytearray, delimited by an array('q') of end offsets
+       - Each entry is prefixed with b's' (str) or b'j' (any other value, as JSON)"""
+    __slots__ = ('data', 'ends')
+
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array('q')
+
+    def append(self, value: Any) -> bool:
+        if type(value) is str:
+            self.data += b's'
+        else:
+            self.data += b'j'
+            value = json.dumps(value)
+
+        self.data += value.encode()
+        self.ends.append(len(self.data))
+
+        return True
+
+    def __getitem__(self, index: int) -> Any:
+        start = self.ends[index - 1] if index else 0
+        text = self.data[start + 1:self.ends[index]].decode()
+
+        return text if self.data[start] == 115 else json.loads(text)  # 115: b's'
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+
+class CompactStore(Sequence):
+    """Columnar Record Store
+       - Records sharing a key schema (key tuple) are stored as one column per key
+       - Columns start as int64 arrays (ints/ids/None) and are promoted as values require:
+         IntColumn -> CodeColumn (dictionary-encoded: array('l') codes + distinct value list)
+         -> TextColumn (packed utf-8) once a column exceeds max_cardinality distinct values
+       - LOW_CARDINALITY keys are never promoted past dictionary encoding
+       - Nested dicts/lists are kept as JSON and decoded on access
+       - Indexing/iteration returns read-only CompactRecord mappings; CompactRecord.dict() for a full dict"""
+    LOW_CARDINALITY = ('container_type', 'label', 'owner', 'sensitivity', 'severity', 'status', 'tenant', 'type',
+                       'version', 'ingest_app', 'asset', 'kill_chain', 'source_data_identifier_type')
+
+    def __init__(self, records: Optional[Iterable[dict]] = None, max_cardinality: Optional[int] = 1024):
+        """
+        Args:
+            records (Optional[Iterable[dict]]):
+            max_cardinality (Optional[int]): Distinct values after which a column (other than
+                LOW_CARDINALITY) is no longer dictionary-encoded; None never stops encoding"""
+        self.max_cardinality = max_cardinality
+        self.schemas: List[Tuple[str, ...]] = []
+        self.schema_ids: Dict[Tuple[str, ...], int] = {}
+        self.positions: List[Dict[str, int]] = []
+        self.columns: List[list] = []  # schema_id -> one column per key
+        self.counts: List[int] = []  # schema_id -> rows
+        self.row_schema = array('l')
+        self.row_offset = array('q')  # row -> index within its schema's columns
+
+        if records:
+            self.extend(records)
+
+    def promote(self, key: str, column: Union[IntColumn, CodeColumn]) -> Union[CodeColumn, TextColumn]:
+        if type(column) is IntColumn:
+            promoted = CodeColumn(None if key in self.LOW_CARDINALITY else self.max_cardinality)
+            if all(promoted.append(column[i]) for i in range(0, len(column))):
+                return promoted
+
+        promoted = TextColumn()
+        for i in range(0, len(column)):
+            promoted.append(column[i])
+
+        return promoted
+
+    def append(self, record: dict) -> None:
+        keys = tuple(record.keys())
+        try:
+            schema_id = self.schema_ids[keys]
+        except KeyError:
+            schema_id = self.schema_ids[keys] = len(self.schemas)
+            self.schemas.append(keys)
+            self.positions.append({k: i for i, k in enumerate(keys)})
+            self.columns.append([IntColumn() for _ in keys])
+            self.counts.append(0)
+
+        columns = self.columns[schema_id]
+        for i, value in enumerate(record.values()):
+            column = columns[i]
+            while not column.append(value):
+                columns[i] = column = self.promote(keys[i], column)
+
+        self.row_schema.append(schema_id)
+        self.row_offset.append(self.counts[schema_id])
+        self.counts[schema_id] += 1
+
+    def extend(self, records: Iterable[dict]) -> None:
+        for record in records:
+            self.append(record)
+
+    def cardinality(self) -> Dict[str, int]:
+        """Distinct values per dictionary-encoded key (largest across schemas)"""
+        cardinality = {}
+        for keys, columns in zip(self.schemas, self.columns):
+            for key, column in zip(keys, columns):
+                if type(column) is CodeColumn:
+                    cardinality[key] = max(cardinality.get(key, 0), len(column.values))
+
+        return cardinality
+
+    def __len__(self) -> int:
+        return len(self.row_schema)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union['CompactRecord', List['CompactRecord']]:
+        if type(index) is slice:
+            return [CompactRecord(self, i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+
+        return CompactRecord(self, index)
+
+    def __iter__(self) -> Iterator['CompactRecord']:
+        return (CompactRecord(self, i) for i in range(0, len(self)))
+
+    def __repr__(self) -> str:
+        return f'CompactStore(records={len(self)}, schemas={len(self.schemas)}, encoded={self.cardinality()})'
+
+    def dicts(self) -> Iterator[dict]:
+        for i in range(0, len(self)):
+            yield CompactRecord(self, i).dict()
+
+
+class CompactRecord(Mapping):
+    """Read-only view of one CompactStore row."""
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store: CompactStore, index: int):
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, key: str) -> Any:
+        schema_id = self.store.row_schema[self.index]
+
+        return self.store.columns[schema_id][self.store.positions[schema_id][key]][self.store.row_offset[self.index]]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.store.positions[self.store.row_schema[self.index]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.schemas[self.store.row_schema[self.index]])
+
+    def __len__(self) -> int:
+        return len(self.store.schemas[self.store.row_schema[self.index]])
+
+    def dict(self) -> dict:
+        schema_id = self.store.row_schema[self.index]
+        offset = self.store.row_offset[self.index]
+
+        return {k: c[offset] for k, c in zip(self.store.schemas[schema_id], self.store.columns[schema_id])}
+
+    def __repr__(self) -> str:
+        return f'CompactRecord({self.dict()})'
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Blocking Client
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+
+import asyncio
+import inspect
+import logging
+import threading
+from typing import Any, Awaitable, Iterator, Optional, Union
+
+from phantom_api_client.client import PhantomApiClient
+
+logger = logging.getLogger(__name__)
+
+
+class SyncPhantomApiClient:
+    """Blocking PhantomApiClient Facade
+       - Owns one event loop on a background thread and one PhantomApiClient (session/connection pool) on it
+       - Client coroutine methods become blocking calls, e.g. get_records(query) -> Results
+       - Async generator methods (get_pages, stream_audit_records, poll_runs, ...) become blocking iterators
+       - Safe to use from sync code, Jupyter (which already runs a loop) and several threads at once"""
+
+    def __init__(self, cfg: Union[str, dict], timeout: Optional[float] = None, **kwargs):
+        """
+        Args:
+            cfg (Union[str, dict]): See PhantomApiClient
+            timeout (Optional[float]): Seconds to wait for each call; default no limit
+            **kwargs: Passed to PhantomApiClient"""
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='phantom-api-client', daemon=True)
+        self.thread.start()
+
+        async def create() -> PhantomApiClient:
+            return PhantomApiClient(cfg, **kwargs)
+
+        self.client: Optional[PhantomApiClient] = self.run(create())
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Runs a coroutine on the background loop and blocks for its result."""
+        if threading.current_thread() is self.thread:
+            raise RuntimeError('SyncPhantomApiClient cannot be called from its own event loop; use the async client.')
+
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout if timeout is not None else self.timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def iterate(self, agen: Any) -> Iterator[Any]:
+        """Blocking iterator over an async generator running on the background loop."""
+        finished = False
+        try:
+            while True:
+                try:
+                    yield self.run(agen.__anext__())
+                except StopAsyncIteration:
+                    finished = True
+                    return
+        finally:
+            if not finished and self.loop.is_running():
+                self.run(agen.aclose())
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.client, name)
+
+        if inspect.isasyncgenfunction(attr):
+            def blocking(*args, **kwargs):
+                return self.iterate(attr(*args, **kwargs))
+        elif inspect.iscoroutinefunction(attr):
+            def blocking(*args, **kwargs):
+                return self.run(attr(*args, **kwargs))
+        else:
+            return attr
+
+        blocking.__name__, blocking.__doc__ = name, attr.__doc__
+
+        return blocking
+
+    def close(self) -> None:
+        """Flushes and closes the client, then stops the loop thread."""
+        if not self.loop.is_running():
+            return
+
+        try:
+            if self.client:
+                self.run(self.client.__aexit__(None, None, None))
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop.close()
+
+    def __enter__(self) -> 'SyncPhantomApiClient':
+        return self
+
+    def __exit__(self, exc_type: None, exc_val: None, exc_tb: None) -> None:
+        self.close()
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Tracing
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+import aiohttp as aio
+
+logger = logging.getLogger(__name__)
+
+current_span: ContextVar[Optional['Span']] = ContextVar('current_span', default=None)
+
+
+@dataclass
+class Span:
+    """
+    Attributes:
+        method (str): get|post|delete or 'process' for process_results
+        end_point (str):
+        request_id (Optional[str]):
+        page (Optional[int]):
+        status (Optional[int]): HTTP status
+        bytes_in (int): Response body bytes; decoded
+        bytes_in_wire (int): Response body bytes as sent; Content-Length, or counted as read for streamed
+                             responses; 0 if unknown (e.g. chunked and not streamed)
+        encoding (Optional[str]): Response Content-Encoding
+        bytes_out (int): Request body bytes
+        records (Optional[int]): Records processed; 'process' spans only
+        error (Optional[str]):
+        start_ns (int): Wall clock start; epoch nanoseconds
+        t_start (float): perf_counter at request() entry
+        t_sent (Optional[float]): Semaphore acquired; request started
+        t_connect_start (Optional[float]): New connection (incl. TLS) started
+        t_connect_end (Optional[float]):
+        t_headers (Optional[float]): Response headers received
+        t_body (Optional[float]): Last body chunk received
+        t_end (Optional[float]): request() returned"""
+    method: str
+    end_point: str
+    request_id: Optional[str] = None
+    page: Optional[int] = None
+    status: Optional[int] = None
+    bytes_in: int = 0
+    bytes_in_wire: int = 0
+    encoding: Optional[str] = None
+    bytes_out: int = 0
+    records: Optional[int] = None
+    error: Optional[str] = None
+    start_ns: int = field(default_factory=time.time_ns)
+    t_start: float = field(default_factory=time.perf_counter)
+    t_sent: Optional[float] = None
+    t_connect_start: Optional[float] = None
+    t_connect_end: Optional[float] = None
+    t_headers: Optional[float] = None
+    t_body: Optional[float] = None
+    t_end: Optional[float] = None
+
+    @property
+    def queued(self) -> float:
+        """Seconds waiting on the semaphore"""
+        return (self.t_sent or self.t_end) - self.t_start
+
+    @property
+    def connect(self) -> float:
+        """Seconds establishing a new connection (incl. TLS); 0 when reused"""
+        return self.t_connect_end - self.t_connect_start if self.t_connect_start and self.t_connect_end else 0.0
+
+    @property
+    def ttfb(self) -> float:
+        """Seconds from request sent to response headers; server time"""
+        if not self.t_headers:
+            return 0.0
+
+        return self.t_headers - (self.t_connect_end or self.t_sent or self.t_start)
+
+    @property
+    def download(self) -> float:
+        """Seconds receiving the response body"""
+        return self.t_body - self.t_headers if self.t_body and self.t_headers else 0.0
+
+    @property
+    def decode(self) -> float:
+        """Seconds after the body was received until request() returned; json decode"""
+        return self.t_end - (self.t_body or self.t_headers or self.t_end)
+
+    @property
+    def duration(self) -> float:
+        return self.t_end - self.t_start
+
+    def dict(self) -> dict:
+        return {'method':        self.method,
+                'end_point':     self.end_point,
+                'request_id':    self.request_id,
+                'page':          self.page,
+                'status':        self.status,
+                'bytes_in':      self.bytes_in,
+                'bytes_in_wire': self.bytes_in_wire,
+                'encoding':      self.encoding,
+                'bytes_out':     self.bytes_out,
+                'records':       self.records,
+                'error':         self.error,
+                'queued':        self.queued,
+                'connect':       self.connect,
+                'ttfb':          self.ttfb,
+                'download':      self.download,
+                'decode':        self.decode,
+                'duration':      self.duration}
+
+
+class Tracer:
+    """Per-Request Tracing
+       - Callbacks receive each finished Span
+       - Phase timestamps are collected with an aiohttp TraceConfig on the client session"""
+
+    def __init__(self, *callbacks: Callable[[Span], None]):
+        self.callbacks: List[Callable[[Span], None]] = list(callbacks)
+
+    def start(self, method: str, end_point: str, request_id: Optional[str] = None, params: Optional[dict] = None) -> Span:
+        span = Span(method=method, end_point=end_point, request_id=request_id, page=(params or {}).get('page'))
+        span.token = current_span.set(span)
+
+        return span
+
+    def finish(self, span: Span, error: Optional[Exception] = None) -> None:
+        span.t_end = time.perf_counter()
+        if error:
+            span.error = repr(error)
+
+        try:
+            current_span.reset(span.__dict__.pop('token'))
+        except (KeyError, ValueError):  # Finished from another context
+            pass
+
+        self.emit(span)
+
+    def process(self, end_point: str, started: float, records: int) -> None:
+        """Emits a 'process' span for a process_results call.
+
+        Args:
+            end_point (str):
+            started (float): perf_counter before process_results
+            records (int): Records processed"""
+        span = Span(method='process', end_point=end_point, records=records, t_start=started)
+        span.start_ns -= int((time.perf_counter() - started) * 1e9)
+        span.t_sent = span.t_end = time.perf_counter()
+        self.emit(span)
+
+    def emit(self, span: Span) -> None:
+        for callback in self.callbacks:
+            try:
+                callback(span)
+            except Exception as excp:
+                logger.exception(excp)
+
+    def trace_config(self) -> aio.TraceConfig:
+        """
+        Returns:
+            trace_config (aio.TraceConfig): Records phase timestamps on the current Span"""
+
+        async def on_request_start(session, ctx, params):
+            span = current_span.get()
+            if span:
+                span.t_sent = time.perf_counter()
+
+        async def on_connection_create_start(session, ctx, params):
+            span = current_span.get()
+            if span:
+                span.t_connect_start = time.perf_counter()
+
+        async def on_connection_create_end(session, ctx, params):
+            span = current_span.get()
+            if span:
+                span.t_connect_end = time.perf_counter()
+
+        async def on_request_chunk_sent(session, ctx, params):
+            span = current_span.get()
+            if span:
+                span.bytes_out += len(params.chunk)
+
+        async def on_request_end(session, ctx, params):
+            span = current_span.get()
+            if span:
+                span.t_headers = time.perf_counter()
+                span.status = params.response.status
+                span.encoding = params.response.headers.get('Content-Encoding')
+                span.bytes_in_wire = int(params.response.headers.get('Content-Length') or 0)
+
+        async def on_response_chunk_received(session, ctx, params):
+            span = current_span.get()
+            if span:
+                span.t_body = time.perf_counter()
+                span.bytes_in += len(params.chunk)
+
+        trace_config = aio.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_request_chunk_sent.append(on_request_chunk_sent)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_response_chunk_received.append(on_response_chunk_received)
+        trace_config.freeze()
+
+        return trace_config
+
+
+class OpenTelemetryExporter:
+    """Tracer callback that emits OpenTelemetry spans; requires opentelemetry-api.
+       - Phases are added as span events"""
+
+    def __init__(self, tracer_provider=None):
+        from opentelemetry import trace
+
+        self.tracer = trace.get_tracer(__name__, tracer_provider=tracer_provider)
+
+    def __call__(self, span: Span) -> None:
+        def ns(t: float) -> int:
+            return span.start_ns + int((t - span.t_start) * 1e9)
+
+        attributes = {f'phantom.{k}': v for k, v in span.dict().items() if v is not None}
+        otel_span = self.tracer.start_span(f'{span.method.upper()} {span.end_point}',
+                                           start_time=span.start_ns,
+                                           attributes=attributes)
+
+        for name, t in (('semaphore_acquired', span.t_sent),
+                        ('connect_start', span.t_connect_start),
+                        ('connect_end', span.t_connect_end),
+                        ('headers_received', span.t_headers),
+                        ('body_received', span.t_body)):
+            if t:
+                otel_span.add_event(name, timestamp=ns(t))
+
+        if span.error:
+            otel_span.set_attribute('error', True)
+
+        otel_span.end(end_time=ns(span.t_end))
+
+
+if __name__ == '__main__':
+    print(__doc__)
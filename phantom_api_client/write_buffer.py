@@ -0,0 +1,171 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Write Buffer
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from uuid import uuid4
+
+from base_api_client import Results
+from phantom_api_client.models import ArtifactRequest, ContainerRequest
+
+logger = logging.getLogger(__name__)
+
+
+def changes(request: Union[ArtifactRequest, ContainerRequest], explicit: Optional[Iterable[str]] = None) -> dict:
+    """Fields of a request the caller set, whether or not they equal the dataclass defaults.
+
+    Args:
+        request (Union[ArtifactRequest, ContainerRequest]):
+        explicit (Optional[Iterable[str]]): Field names to send; defaults to request.fields_set
+
+    Returns:
+        dct (dict)"""
+    explicit = request.fields_set if explicit is None else set(explicit)
+
+    dct = {}
+    for k, v in request.dict(sort_order=None).items():
+        if k == 'data':
+            v = {dk: dv for dk, dv in v.items() if dk != 'request_id'}
+            if not v:
+                continue
+        elif k not in explicit:
+            continue
+
+        dct[k] = v
+
+    return dct
+
+
+class WriteBuffer:
+    """Write-Behind Update Buffer
+       - Merges pending ContainerRequest/ArtifactRequest changes per record id
+       - Sends one minimal POST per record on size, time or explicit flush()"""
+
+    def __init__(self, client, size: Optional[int] = 100, delay: Optional[float] = 1.0):
+        """
+        Args:
+            client (PhantomApiClient):
+            size (Optional[int]): Flush once this many records are pending
+            delay (Optional[float]): Flush this many seconds after the first pending change"""
+        self.client = client
+        self.size = size
+        self.delay = delay
+        self.pending: Dict[Tuple[str, int], dict] = {}
+        self.waiters: Dict[Tuple[str, int], List[asyncio.Future]] = {}
+        self.lock = asyncio.Lock()
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.flushing: Optional[asyncio.Task] = None  # Flush started by the timer
+
+    def __len__(self):
+        return len(self.pending)
+
+    async def put(self, request: Union[ArtifactRequest, ContainerRequest]) -> asyncio.Future:
+        """Queue a request's changes; merged with any pending changes for the same record.
+
+        Args:
+            request (Union[ArtifactRequest, ContainerRequest]):
+
+        Returns:
+            future (asyncio.Future): Resolves to the response record once the change is sent"""
+        if not request.id:
+            raise ValueError(f'{type(request).__name__} requires an id to be buffered.')
+
+        key = ('/container' if type(request) is ContainerRequest else '/artifact', request.id)
+        merged = self.pending.setdefault(key, {})
+
+        for k, v in changes(request).items():
+            if type(v) is dict and type(merged.get(k)) is dict:
+                merged[k] = {**merged[k], **v}
+            else:
+                merged[k] = v
+
+        future = asyncio.get_event_loop().create_future()
+        self.waiters.setdefault(key, []).append(future)
+
+        if self.size and len(self.pending) >= self.size:
+            await self.flush()
+        elif self.delay and not self.timer:
+            self.timer = asyncio.get_event_loop().call_later(self.delay, self.flush_later)
+
+        return future
+
+    def flush_later(self) -> None:
+        """Timer callback; runs flush() as a task kept in self.flushing."""
+        self.timer = None
+        self.flushing = asyncio.ensure_future(self.flush())
+        self.flushing.add_done_callback(self.flushed)
+
+    def flushed(self, task: asyncio.Task) -> None:
+        """Done callback for a timer flush; its waiters already hold any exception, so it's logged here."""
+        if self.flushing is task:
+            self.flushing = None
+
+        if not task.cancelled() and task.exception():
+            logger.error(f'Buffered update flush failed: {task.exception()!r}')
+
+    async def flush(self) -> Results:
+        """Send all pending changes; one POST per record.
+           - Waits for a flush already started by the timer first
+
+        Returns:
+            results (Results)"""
+        flushing = self.flushing
+        if flushing and flushing is not asyncio.current_task():
+            await asyncio.wait([flushing])  # Its exception is logged by flushed()
+
+        async with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+
+            pending, self.pending = self.pending, {}
+            waiters, self.waiters = self.waiters, {}
+
+            if not pending:
+                return Results(data=[])
+
+            logger.debug(f'Flushing {len(pending)} buffered update(s)...')
+
+            request_ids = {k: uuid4().hex for k in pending.keys()}
+            tasks = [asyncio.create_task(self.client.request(method='post',
+                                                             end_point=f'{k[0]}/{k[1]}',
+                                                             request_id=request_ids[k],
+                                                             json=v)) for k, v in pending.items()]
+
+            try:
+                results = await self.client.process_results(Results(data=await asyncio.gather(*tasks)),
+                                                            end_point=','.join(sorted({f'{k[0]}/{{id}}' for k in pending})))
+            except Exception as excp:
+                for futures in waiters.values():
+                    [f.set_exception(excp) for f in futures if not f.done()]
+                raise
+
+            index = {r.get('request_id'): r for r in [*results.success, *results.failure] if type(r) is dict}
+            for k, futures in waiters.items():
+                [f.set_result(index.get(request_ids[k])) for f in futures if not f.done()]
+
+            logger.debug('-> Complete.')
+
+            return results
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -46,7 +46,7 @@ def main() -> NoReturn:
                        'Topic :: Internet',
                        'Topic :: Internet :: WWW/HTTP'],
           description='Phantom API Client Library',
-          entry_points={'console_scripts': []},
+          entry_points={'console_scripts': ['phantom-api-client = phantom_api_client.cli:main']},
           include_package_data=True,
           install_requires=['base-api-client',
                             'delorean'],
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Test Annotations
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import time
+
+import pytest
+from os import getenv
+
+from base_api_client import bprint, Results, tprint
+from phantom_api_client import PhantomApiClient
+from phantom_api_client.models import Comment, Note, Pin
+from tests.extras.generate_objects import generate_container
+
+
+@pytest.mark.asyncio
+async def test_create_annotations():
+    ts = time.perf_counter()
+    bprint('Test: Create Annotations')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        response_results, containers = await pac.create_containers(generate_container())
+        container_id = containers[0].id
+
+        async def annotations():
+            for i in range(0, 30):
+                yield Note(title=f'Note {i}', content='Test note.', container_id=container_id)
+                yield Comment(container_id=container_id, comment=f'Comment {i}')
+                yield Pin(container_id=container_id, message=f'Pin {i}', data='Test pin.')
+
+        results = await pac.create_annotations(annotations(), window=10)
+
+        assert type(results) is Results
+        assert not results.failure
+        assert sorted(r['index'] for r in results.success) == list(range(0, 90))
+
+        tprint(results, top=5)
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -509,3 +509,23 @@ async def test_delete_all_container_artifacts():
         tprint(results)
 
     bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_get_containers_with_artifacts():
+    ts = time.perf_counter()
+    bprint('Test: Get Containers With Artifacts')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        results = await pac.get_record_count(query=ContainerQuery(filter={'_filter_tenant': 2}))
+        count = results.success[0]['count']
+
+        containers = [c async for c in pac.get_containers_with_artifacts(query=ContainerQuery(filter={'_filter_tenant': 2}))]
+
+        assert len(containers) == count
+        assert all(type(c['artifacts']) is list for c in containers)
+        assert all(a['container'] == c['id'] for c in containers for a in c['artifacts'])
+
+        print(*[(c['id'], len(c['artifacts'])) for c in containers[:5]], sep='\n')
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
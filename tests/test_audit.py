@@ -17,6 +17,7 @@ copies or substantial portions of the Software.
 
 You should have received a copy of the SSPL along with this program.
 If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import datetime as dt
 import time
 
 import pytest
@@ -24,7 +25,7 @@ from os import getenv
 
 from base_api_client import bprint, Results, tprint
 from phantom_api_client import PhantomApiClient
-from phantom_api_client.models import AuditQuery
+from phantom_api_client.models import AuditColumns, AuditQuery, AuditRecord
 
 
 @pytest.mark.asyncio
@@ -97,3 +98,91 @@ async def test_get_one_container_audit_data():
 #         tprint(results, top=5)
 #
 #     bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_get_audit_data_windowed():
+    ts = time.perf_counter()
+    bprint('Test: Get Audit Data Windowed')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        results = await pac.get_audit_records(query=AuditQuery(start='2019-10-01', end='2019-10-08'),
+                                              window=dt.timedelta(hours=6))
+        # print(results)
+
+        assert type(results) is Results
+        assert len(results.success) >= 1
+        assert not results.failure
+
+        times = [v for r in results.success for k, v in r.items() if k.lower() == 'time']
+        assert times == sorted(times)
+
+        tprint(results, top=5)
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_get_audit_data_columnar():
+    ts = time.perf_counter()
+    bprint('Test: Get Audit Data Columnar')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        results = await pac.get_audit_records(query=AuditQuery(start='2019-10-01', end='2019-10-08'), columnar=True)
+
+        assert type(results) is Results
+        assert type(results.success) is AuditColumns
+        assert len(results.success) >= 1
+        assert not results.failure
+        assert list(results.success.column('time')) == sorted(results.success.column('time'))
+        assert type(results.success[0]) is AuditRecord
+        assert type(results.success[0].time) is dt.datetime
+
+        print(f'Users: {results.success.categories["user"]}')
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_stream_audit_data_csv():
+    ts = time.perf_counter()
+    bprint('Test: Stream Audit Data CSV')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        count = 0
+        async for record in pac.stream_audit_records(query=AuditQuery(start='2019-10-01', end='2019-10-08')):
+            assert type(record) is AuditRecord
+            assert type(record.time) is dt.datetime
+            count += 1
+
+        assert count >= 1
+        print(f'Streamed {count} audit record(s).')
+
+        path = f'{getenv("CFG_HOME")}/audit_export.csv'
+        size = await pac.export_audit_records(query=AuditQuery(start='2019-10-01', end='2019-10-08'), path=path)
+
+        assert size >= 1
+        print(f'Exported {size} bytes to {path}.')
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_follow_audit_data():
+    ts = time.perf_counter()
+    bprint('Test: Follow Audit Data')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        records = []
+        async for record in pac.follow_audit(start=dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=1)):
+            assert type(record) is AuditRecord
+            records.append(record)
+            if len(records) == 5:
+                break
+
+        assert len(records) == 5
+        assert [r.time for r in records] == sorted(r.time for r in records)
+
+        print(*[r.__dict__ for r in records], sep='\n')
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Test CLI
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import json
+import time
+
+from os import getenv
+
+from base_api_client import bprint
+from phantom_api_client.cli import main, parse_values
+
+
+def test_parse_values():
+    assert parse_values(['status="closed"', 'severity=high', 'owner_id=3']) == {'status': 'closed', 'severity': 'high', 'owner_id': 3}
+
+
+def test_cli_count_and_export(tmp_path, capsys):
+    ts = time.perf_counter()
+    bprint('Test: CLI Count and Export')
+
+    cfg = f'{getenv("CFG_HOME")}/phantom_api_client.toml'
+    assert main(['count', 'container', '-c', cfg, '-f', '_filter_tenant=2']) == 0
+    count = int(capsys.readouterr().out)
+
+    output = tmp_path / 'containers.ndjson'
+    assert main(['export', 'container', '-c', cfg, '-f', '_filter_tenant=2', '-o', str(output), '-q']) == 0
+
+    with open(output) as f:
+        containers = [json.loads(line) for line in f]
+
+    assert len(containers) == count
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+def test_cli_delete_dry_run(capsys):
+    ts = time.perf_counter()
+    bprint('Test: CLI Delete Dry Run')
+
+    cfg = f'{getenv("CFG_HOME")}/phantom_api_client.toml'
+    assert main(['count', 'container', '-c', cfg, '-f', '_filter_tenant=2']) == 0
+    count = int(capsys.readouterr().out)
+
+    assert main(['delete', 'container', '-c', cfg, '-f', '_filter_tenant=2', '-q']) == 0
+    assert f'Would delete {count} container(s)' in capsys.readouterr().err
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Test Client
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import time
+
+import pytest
+from os import getenv
+
+from base_api_client import bprint, Results
+from phantom_api_client import PhantomApiClient
+from phantom_api_client.models import AuditQuery, ContainerQuery, ContainerRequest, UserQuery
+
+
+@pytest.mark.asyncio
+async def test_tracing():
+    ts = time.perf_counter()
+    bprint('Test: Tracing')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        spans = []
+        pac.enable_tracing(spans.append)
+        results = await pac.get_records(query=ContainerQuery(page_size=100, filter={'_filter_tenant': 2}))
+
+        assert type(results) is Results
+        assert not results.failure
+
+        requests = [s for s in spans if s.method == 'get']
+        assert requests
+        assert all(s.status == 200 for s in requests)
+        assert all(s.bytes_in > 0 for s in requests)
+        assert any(s.method == 'process' for s in spans)
+
+        print(*[s.dict() for s in spans], sep='\n')
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_metrics():
+    ts = time.perf_counter()
+    bprint('Test: Metrics')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        metrics = await pac.enable_metrics()
+        results = await pac.get_records(query=ContainerQuery(page_size=100, filter={'_filter_tenant': 2}))
+
+        assert type(results) is Results
+        assert not results.failure
+
+        snapshot = metrics.snapshot()
+        assert snapshot['phantom_api_client_requests_total']['/container,get,200'] >= 1
+        assert snapshot['phantom_api_client_records_decoded_total'][''] >= len(results.success)
+        assert snapshot['phantom_api_client_in_flight'][''] == 0
+
+        print(metrics.exposition())
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_coalesce():
+    ts = time.perf_counter()
+    bprint('Test: Coalesce')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        metrics = await pac.enable_metrics()
+        results = await asyncio.gather(*[pac.get_records(query=UserQuery()) for _ in range(0, 10)])
+
+        assert all(not r.failure for r in results)
+        assert all(r.success == results[0].success for r in results)
+
+        snapshot = metrics.snapshot()
+        assert snapshot['phantom_api_client_requests_coalesced_total']['/ph_user'] >= 9
+        assert not pac.in_flight
+
+        print(metrics.exposition())
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_compression():
+    ts = time.perf_counter()
+    bprint('Test: Compression')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml', compress_threshold=1024) as pac:
+        metrics = await pac.enable_metrics()
+        results = await pac.get_records(query=ContainerQuery(page=0, page_size=100, include_expensive=True))
+
+        assert type(results) is Results
+        assert not results.failure
+
+        containers = [ContainerRequest(id=c['id'], data={f'key_{i}': 'value' * 10 for i in range(0, 50)})
+                      for c in results.success[:5]]
+        results = await pac.update_records(containers)
+
+        assert not results.failure
+
+        snapshot = metrics.snapshot()
+        assert snapshot['phantom_api_client_compression_ratio']['out'] > 1
+        print(snapshot['phantom_api_client_compression_ratio'])
+
+        # Streamed (chunked) responses count wire bytes as read
+        records = [r async for r in pac.stream_audit_records(AuditQuery(start='2019-10-01', end='2019-10-02'))]
+        assert records
+
+        snapshot = metrics.snapshot()
+        assert snapshot['phantom_api_client_compressed_body_bytes_total']['in,wire'] > 0
+        assert snapshot['phantom_api_client_compression_ratio']['in'] > 1
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
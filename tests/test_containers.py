@@ -17,6 +17,7 @@ copies or substantial portions of the Software.
 
 You should have received a copy of the SSPL along with this program.
 If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
 import time
 
 import pytest
@@ -24,8 +25,8 @@ from os import getenv
 from random import choice
 
 from base_api_client import bprint, Results, tprint
-from phantom_api_client import PhantomApiClient
-from phantom_api_client.models import ContainerQuery
+from phantom_api_client import CompactRecord, CompactStore, LazyRecord, PhantomApiClient, SpillList
+from phantom_api_client.models import ContainerQuery, ContainerRequest
 from tests.extras.generate_objects import generate_container
 
 
@@ -114,6 +115,76 @@ async def test_get_all_containers_filtered():
     bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
 
 
+@pytest.mark.asyncio
+async def test_get_all_containers_spilled():
+    ts = time.perf_counter()
+    bprint('Test: Get All Containers Spilled')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        results = await pac.get_record_count(query=ContainerQuery(filter={'_filter_tenant': 2}))
+        count = results.success[0]['count']
+
+        results = await pac.get_records(query=ContainerQuery(page_size=100, filter={'_filter_tenant': 2}), memory_limit=100)
+
+        assert type(results) is Results
+        assert type(results.success) is SpillList
+        assert len(results.success) == count
+        assert len([c for c in results.success]) == count
+        assert results.success[-1]['id']
+        assert not results.failure
+
+        print(results.success)
+        tprint(results, top=5)
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_get_all_containers_lazy():
+    ts = time.perf_counter()
+    bprint('Test: Get All Containers Lazy')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        results = await pac.get_record_count(query=ContainerQuery(filter={'_filter_tenant': 2}))
+        count = results.success[0]['count']
+
+        results = await pac.get_records(query=ContainerQuery(filter={'_filter_tenant': 2}), lazy=True)
+
+        assert type(results) is Results
+        assert len(results.success) == count
+        assert type(results.success[0]) is LazyRecord
+        assert all(type(r['id']) is int for r in results.success)
+        assert results.success[0].dict()['id'] == results.success[0]['id']
+        assert not results.failure
+
+        print(*[(r['id'], r['status'], r['owner_id'], r['create_time']) for r in results.success[:5]], sep='\n')
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_get_all_containers_compact():
+    ts = time.perf_counter()
+    bprint('Test: Get All Containers Compact')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        results = await pac.get_record_count(query=ContainerQuery(filter={'_filter_tenant': 2}))
+        count = results.success[0]['count']
+
+        results = await pac.get_records(query=ContainerQuery(filter={'_filter_tenant': 2}), compact=True)
+
+        assert type(results) is Results
+        assert type(results.success) is CompactStore
+        assert len(results.success) == count
+        assert type(results.success[0]) is CompactRecord
+        assert results.success[0].dict()['status'] == results.success[0]['status']
+        assert not results.failure
+
+        print(results.success)
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
 @pytest.mark.asyncio
 async def test_get_all_containers_date_filtered():
     ts = time.perf_counter()
@@ -228,6 +299,30 @@ async def test_get_one_container_phases():
     bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
 
 
+@pytest.mark.asyncio
+async def test_get_many_container_phases():
+    ts = time.perf_counter()
+    bprint('Test: Get Many Container Phases')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        results = await pac.get_records(query=ContainerQuery(page=0, page_size=50, filter={'_filter_container_type': '"case"'}))
+
+        phases = await pac.get_container_phases(results.success, concurrency=10)
+
+        assert sorted(phases.keys()) == sorted(c['id'] for c in results.success)
+        assert all(type(p) is list for p in phases.values())
+
+        cached = await pac.get_container_phases([c['id'] for c in results.success])
+        assert cached == phases
+
+        users = await pac.get_container_permitted_users(results.success[:5])
+        assert len(users) == len(results.success[:5])
+
+        # print(phases)
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
 @pytest.mark.asyncio
 async def test_get_many_containers():
     ts = time.perf_counter()
@@ -252,6 +347,47 @@ async def test_get_many_containers():
     bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
 
 
+@pytest.mark.asyncio
+async def test_get_many_containers_chunked():
+    ts = time.perf_counter()
+    bprint('Test: Get Many Containers Chunked')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        results = await pac.get_records(query=ContainerQuery(page=0, page_size=500))
+        ids = [c['id'] for c in results.success][::-1]
+
+        results = await pac.get_records(query=ContainerQuery(id=[*ids, ids[0]]), ordered=True)
+
+        assert type(results) is Results
+        assert [c['id'] for c in results.success] == ids
+        assert not results.failure
+
+        tprint(results, top=5)
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_load_many_containers():
+    ts = time.perf_counter()
+    bprint('Test: Load Many Containers')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        results = await pac.get_records(query=ContainerQuery(page=0, page_size=50, filter={'_filter_tenant': 2}))
+        ids = [c['id'] for c in results.success]
+
+        records = await asyncio.gather(*[pac.load_record(ContainerQuery(id=i)) for i in [*ids, *ids, 0]])
+
+        assert [r['id'] for r in records[:len(ids)]] == ids
+        assert records[:len(ids)] == records[len(ids):-1]
+        assert records[-1] is None
+        assert len(pac.loader(ContainerQuery).cache) == len(ids) + 1
+
+        # print(records[:5])
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
 @pytest.mark.asyncio
 async def test_create_one_container():
     ts = time.perf_counter()
@@ -301,6 +437,53 @@ async def test_create_many_containers():
     bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
 
 
+@pytest.mark.asyncio
+async def test_upsert_containers():
+    ts = time.perf_counter()
+    bprint('Test: Upsert Containers')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        containers = generate_container(container_count=2)
+        response_results, request_results = await pac.upsert_containers(containers)
+
+        assert type(response_results) is Results
+        assert len(request_results) == 2
+        assert len(response_results.success) == 2
+        assert not response_results.failure
+
+        tprint(response_results, request_results)
+
+        print('\nRe-Ingest; Only Changed Containers Update')
+        containers = generate_container(container_count=2)
+        for i, c in enumerate(containers):
+            c.source_data_identifier = request_results[i].source_data_identifier
+            c.name = request_results[i].name
+        containers[0].name = 'Upsert Test'
+
+        response_results, request_results = await pac.upsert_containers(containers)
+
+        assert len(response_results.success) == 1
+        assert not response_results.failure
+        assert response_results.success[0]['id'] == request_results[0].id
+
+        tprint(response_results, request_results)
+
+        print('\nRe-Ingest; Raised Then Default Severity Both Update')
+        for severity in ('high', 'low'):
+            containers = generate_container(container_count=1)
+            containers[0].source_data_identifier = request_results[1].source_data_identifier
+            containers[0].name = request_results[1].name
+            containers[0].severity = severity
+
+            response_results, _ = await pac.upsert_containers(containers)
+
+            assert len(response_results.success) == 1
+            assert not response_results.failure
+            assert pac.sdi_cache[containers[0].source_data_identifier]['severity'] == severity
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
 @pytest.mark.asyncio
 async def test_update_one_container():
     ts = time.perf_counter()
@@ -371,6 +554,66 @@ async def test_update_many_containers():
     bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
 
 
+@pytest.mark.asyncio
+async def test_buffer_update_one_container():
+    ts = time.perf_counter()
+    bprint('Test: Buffer Update One Container')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml', buffer_size=10) as pac:
+        results = await pac.get_records(query=ContainerQuery(page=0, page_size=20, filter={'_filter_tenant': 2}))
+        old_container = choice(results.success)
+        print(f'Container Prior Update\n\t-> {old_container}')
+
+        futures = await pac.buffer_updates([ContainerRequest(id=old_container['id'], status='open'),
+                                            ContainerRequest(id=old_container['id'], name='Buffer Update Test')])
+        assert len(pac.write_buffer) == 1  # Both updates merged into one pending record
+
+        results = await pac.flush()
+
+        assert type(results) is Results
+        assert len(results.success) == 1
+        assert not results.failure
+        assert (await futures[0]) == (await futures[1])
+        assert (await futures[0])['success']
+
+        tprint(results)
+
+        results = await pac.get_records(query=ContainerQuery(id=old_container['id']))
+        print(f'Container After Update\n\t-> {results.success[0]}')
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_buffer_update_container_to_defaults():
+    ts = time.perf_counter()
+    bprint('Test: Buffer Update Container To Defaults')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        results = await pac.get_records(query=ContainerQuery(page=0, page_size=20, filter={'_filter_tenant': 2}))
+        old_container = choice(results.success)
+        print(f'Container Prior Update\n\t-> {old_container}')
+
+        # Explicitly passed values equal to the dataclass defaults must still be sent
+        futures = await pac.buffer_updates(ContainerRequest(id=old_container['id'], status='new', severity='low'))
+        assert pac.write_buffer.pending[('/container', old_container['id'])] == {'severity': 'low', 'status': 'new'}
+
+        results = await pac.flush()
+
+        assert type(results) is Results
+        assert len(results.success) == 1
+        assert not results.failure
+        assert (await futures[0])['success']
+
+        results = await pac.get_records(query=ContainerQuery(id=old_container['id']))
+        print(f'Container After Update\n\t-> {results.success[0]}')
+
+        assert results.success[0]['status'] == 'new'
+        assert results.success[0]['severity'] == 'low'
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
 @pytest.mark.asyncio
 async def test_delete_one_container():
     ts = time.perf_counter()
@@ -436,3 +679,33 @@ async def test_delete_many_containers():
         tprint(results)
 
     bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_pipeline_delete_containers(tmp_path):
+    ts = time.perf_counter()
+    bprint('Test: Pipeline Delete Containers')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        response_results, containers = await pac.create_containers(generate_container(container_count=10))
+        ids = {c.id for c in containers}
+        targets = {c.id for c in containers[::2]}
+        query = ContainerQuery(page_size=4, filter={'_filter_id__gte': min(ids)})
+
+        results = await pac.pipeline(query, predicate=lambda c: c['id'] in targets, dry_run=True)
+        assert {c['id'] for c in results.success} == targets
+
+        checkpoint = str(tmp_path / 'pipeline.json')
+        results = await pac.pipeline(query, predicate=lambda c: c['id'] in targets, checkpoint=checkpoint,
+                                     read_concurrency=2, write_concurrency=2)
+
+        assert type(results) is Results
+        assert len(results.success) == len(targets)
+        assert not results.failure
+
+        tprint(results)
+
+        results = await pac.get_records(query=ContainerQuery(id=list(ids)))
+        assert {c['id'] for c in results.success} == ids - targets
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
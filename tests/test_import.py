@@ -0,0 +1,69 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Test Import Time
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import subprocess
+import sys
+import time
+
+from base_api_client import bprint
+
+HEAVY = ('aiohttp', 'base_api_client', 'delorean', 'pytz', 'phantom_api_client.client', 'phantom_api_client.models.cef')
+
+
+def import_time(statement: str) -> dict:
+    """Runs statement in a fresh interpreter with -X importtime.
+
+    Returns:
+        dct (dict): module -> cumulative import time (microseconds); plus '__loaded__' heavy modules"""
+    code = f'{statement}; import sys; print(",".join(m for m in {HEAVY!r} if m in sys.modules))'
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=True)
+
+    dct = {'__loaded__': [m for m in proc.stdout.strip().split(',') if m]}
+    for line in proc.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, module = line[12:].split('|')
+            if cumulative.strip().isdigit():
+                dct[module.strip()] = int(cumulative)
+
+    return dct
+
+
+def test_import_is_lazy():
+    ts = time.perf_counter()
+    bprint('Test: Import Is Lazy')
+
+    dct = import_time('import phantom_api_client, phantom_api_client.models; phantom_api_client.models.__all__')
+    assert not dct['__loaded__']
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+def test_import_time():
+    ts = time.perf_counter()
+    bprint('Test: Import Time')
+
+    # Best of 5; the first run may include writing bytecode
+    package = min(import_time('import phantom_api_client')['phantom_api_client'] for _ in range(0, 5))
+    cli = min(import_time('import phantom_api_client.cli')['phantom_api_client.cli'] for _ in range(0, 5))
+    print(f'phantom_api_client: {package / 1000:.1f}ms, phantom_api_client.cli: {cli / 1000:.1f}ms')
+
+    assert package < 50_000
+    assert cli < 100_000
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Test Client Pool
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from os import getenv
+
+from base_api_client import bprint, Results
+from phantom_api_client import ClientPool
+from phantom_api_client.models import ContainerQuery
+
+
+def test_client_pool():
+    ts = time.perf_counter()
+    bprint('Test: Client Pool')
+
+    pool = ClientPool(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml', max_in_flight=8)
+
+    def work(n: int) -> int:
+        async def main() -> int:
+            pac = pool.get()
+            assert pool.get() is pac
+
+            results = await asyncio.gather(*[pac.get_records(query=ContainerQuery(page=i, page_size=10)) for i in range(0, 5)])
+            assert all(type(r) is Results and not r.failure for r in results)
+
+            await pool.release()
+
+            return sum(len(r.success) for r in results)
+
+        return asyncio.run(main())
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        counts = list(executor.map(work, range(0, 8)))
+
+    assert all(c > 0 for c in counts)
+    assert not len(pool)
+    assert pool.limit.value == 8
+
+    print(counts)
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Test Runs
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import time
+
+import pytest
+from os import getenv
+
+from base_api_client import bprint, Results, tprint
+from phantom_api_client import PhantomApiClient
+from phantom_api_client.models import PlaybookRunQuery, PlaybookRunRequest, RUN_COMPLETE
+from tests.extras.generate_objects import generate_container
+
+
+@pytest.mark.asyncio
+async def test_launch_and_poll_playbook_runs():
+    ts = time.perf_counter()
+    bprint('Test: Launch and Poll Playbook Runs')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        response_results, containers = await pac.create_containers(generate_container(container_count=5))
+        assert not response_results.failure
+
+        requests = [PlaybookRunRequest(container_id=c.id, playbook_id=getenv('PLAYBOOK', 'local/test_playbook'))
+                    for c in containers]
+        results = await pac.launch_runs(requests, concurrency=2)
+
+        assert type(results) is Results
+        assert not results.failure
+        assert all(r.id for r in requests)
+
+        runs = [r async for r in pac.poll_runs(PlaybookRunQuery(id=[r.id for r in requests]), timeout=300)]
+
+        assert sorted(r['id'] for r in runs) == sorted(r.id for r in requests)
+        assert all(r['status'] in RUN_COMPLETE for r in runs)
+
+        tprint(results)
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
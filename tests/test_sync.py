@@ -0,0 +1,50 @@
+#!/usr/bin/env python3.8
+"""Phantom API Client: Test Sync Client
+Copyright © 2019 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import time
+
+from os import getenv
+
+from base_api_client import bprint, Results, tprint
+from phantom_api_client import SyncPhantomApiClient
+from phantom_api_client.models import ContainerQuery
+
+
+def test_sync_get_records():
+    ts = time.perf_counter()
+    bprint('Test: Sync Get Records')
+
+    with SyncPhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        results = pac.get_records(query=ContainerQuery(page=0, page_size=10, filter={'_filter_tenant': 2}))
+
+        assert type(results) is Results
+        assert not results.failure
+
+        tprint(results)
+
+        # Repeated small calls reuse the loop and session
+        calls = time.perf_counter()
+        for _ in range(0, 10):
+            pac.get_record_count(query=ContainerQuery())
+        print(f'get_record_count: {(time.perf_counter() - calls) / 10 * 1000:.1f}ms/call')
+
+        pages = list(pac.get_pages(ContainerQuery(page_size=10, filter={'_filter_tenant': 2}), page_limit=2))
+        assert len(pages) == 2
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -25,7 +25,7 @@ from random import choice
 
 from base_api_client import bprint, Results, tprint
 from phantom_api_client.client import PhantomApiClient
-from phantom_api_client.models import UserQuery
+from phantom_api_client.models import ContainerQuery, UserQuery
 
 
 @pytest.mark.asyncio
@@ -88,3 +88,27 @@ async def test_get_one_user():
         tprint(results)
 
     bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_user_directory():
+    ts = time.perf_counter()
+    bprint('Test: User Directory')
+
+    async with PhantomApiClient(cfg=f'{getenv("CFG_HOME")}/phantom_api_client.toml') as pac:
+        users = await pac.user_directory()
+        results = await pac.get_records(query=UserQuery())
+
+        assert len(users) == len(results.success)
+        user = choice(results.success)
+        assert (await users.get(user['id']))['id'] == user['id']
+        assert (await users.get(user['username']))['id'] == user['id']
+
+        results = await pac.get_records(query=ContainerQuery(page=0, page_size=100))
+        containers = await users.resolve(results.success)
+
+        assert all('owner_name' in c for c in containers)
+
+        tprint(results, top=5)
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')